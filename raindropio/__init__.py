@@ -4,37 +4,84 @@ __all__ = (
     "Access",
     "AccessLevel",
     "BrokenLevel",
+    "Cache",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CacheStatus",
     "Collection",
     "CollectionRef",
+    "CollectionSort",
+    "ConflictError",
+    "DeadlineExceeded",
     "DictModel",
+    "File",
     "FontColor",
     "Group",
+    "Highlight",
+    "HTTPXTransport",
+    "Lane",
+    "MemoryTransport",
+    "Model",
+    "OAuth2Transport",
+    "Prefetcher",
+    "Profile",
     "Raindrop",
     "RaindropType",
+    "Scheduler",
+    "SearchQuery",
+    "Snapshot",
+    "SortOrder",
+    "Stats",
+    "StatsCache",
+    "Transport",
+    "UpdateQueue",
     "User",
     "UserConfig",
     "UserFiles",
     "UserRef",
     "View",
     "create_oauth2session",
+    "lane",
+    "to_arrow",
+    "to_pandas",
+    "write_snapshot",
     "__version__",
 )
 
 from .api import API, create_oauth2session  # noqa
+from .frames import to_arrow, to_pandas  # noqa
 from .models import Collection  # noqa
 from .models import (
     Access,
     AccessLevel,
     BrokenLevel,
+    Cache,
+    CacheStatus,
     CollectionRef,
+    CollectionSort,
+    ConflictError,
     DictModel,
+    File,
     FontColor,
     Group,
+    Highlight,
+    Model,
     Raindrop,
     RaindropType,
+    SearchQuery,
+    SortOrder,
+    Stats,
     User,
     UserConfig,
     UserFiles,
     UserRef,
     View,
 )
+from .prefetch import Prefetcher  # noqa
+from .profile import Profile  # noqa
+from .resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded  # noqa
+from .scheduler import Lane, Scheduler, lane  # noqa
+from .snapshot import Snapshot, write_snapshot  # noqa
+from .stats import StatsCache  # noqa
+from .transport import HTTPXTransport, MemoryTransport, OAuth2Transport, Transport
+from .writebehind import UpdateQueue  # noqa
@@ -2,14 +2,50 @@ from __future__ import annotations
 
 import datetime
 import enum
+import functools
 import json
-from typing import Any, Dict, Optional, Union
-
-import requests
-from requests_oauthlib import OAuth2Session
+import os
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .transport import OAuth2Transport, Transport, _access_token
+
+if TYPE_CHECKING:
+    from requests_oauthlib import OAuth2Session
+
+    from .multipart import MultipartEncoder
+    from .prefetch import Prefetcher
+    from .profile import Profile
+    from .resilience import CircuitBreaker
+    from .scheduler import Scheduler
+    from .stats import StatsCache
+    from .transport import Response
+
+
+def __getattr__(name: str) -> Any:
+    # requests_oauthlib is imported on demand to speed up `import raindropio`.
+    if name == "OAuth2Session":
+        from requests_oauthlib import OAuth2Session
+
+        return OAuth2Session
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def create_oauth2session(*args: Any, **kwargs: Any) -> OAuth2Session:
+    from requests_oauthlib import OAuth2Session
+
     session = OAuth2Session(*args, **kwargs)
 
     #    session.register_compliance_hook("access_token_response", update_expires)
@@ -17,11 +53,45 @@ def create_oauth2session(*args: Any, **kwargs: Any) -> OAuth2Session:
     return session
 
 
+class _Flight:
+    """A GET request in progress, shared by identical concurrent requests."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[Response] = None
+        self.error: Optional[BaseException] = None
+
+
+def _range_total(headers: Mapping[str, str]) -> Optional[int]:
+    """Return the total size in the ``Content-Range`` header."""
+
+    total = headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
 class API:
     """Provides communication to the Raindrop.io API server.
 
     :param token: An access token for authorization.
     :type token: string or dict.
+
+    :param transport: (optional) :class:`~raindropio.transport.Transport` to
+        send requests. Defaults to
+        :class:`~raindropio.transport.OAuth2Transport`.
+
+    :param coalesce: If True, identical GET requests sent concurrently from
+        multiple threads share a single request and its response.
+
+    :param scheduler: (optional) :class:`~raindropio.scheduler.Scheduler`
+        shared by API objects of the same token to send requests in
+        priority order.
+
+    :param timeout: (optional) Seconds to wait for the server to respond or
+        send data. ``None`` to wait forever.
+
+    :param breaker: (optional)
+        :class:`~raindropio.resilience.CircuitBreaker` to fail fast on
+        failing endpoints.
     """
 
     URL_AUTHORIZE = "https://raindrop.io/oauth/authorize"
@@ -32,24 +102,52 @@ class API:
     ratelimit_remaining: Optional[int] = None
     ratelimit_reset: Optional[int] = None
 
+    #: (:class:`~raindropio.prefetch.Prefetcher`) Installed prefetcher.
+    prefetcher: Optional[Prefetcher] = None
+
+    #: (:class:`~raindropio.stats.StatsCache`) Installed stats cache.
+    stats_cache: Optional[StatsCache] = None
+
+    _profile: Optional[Profile] = None
+
     def __init__(
         self,
         token: Union[str, Dict[str, Any]],
         client_id: Optional[str] = None,
         client_secret: Optional[str] = None,
         token_type: str = "Bearer",
+        transport: Optional[Transport] = None,
+        coalesce: bool = True,
+        scheduler: Optional[Scheduler] = None,
+        timeout: Optional[float] = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
     ) -> None:
         self.token = token
         self.client_id = client_id
         self.client_secret = client_secret
         self.token_type = token_type
 
-        self.session = None
+        self.transport = transport or OAuth2Transport()
+        self._opened = False
+
+        self.coalesce = coalesce
+        self._flights: Dict[Tuple[str, str, str], _Flight] = {}
+        self._flights_lock = threading.Lock()
+
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.breaker = breaker
+        self._local = threading.local()
 
         self.open()
 
+    @property
+    def session(self) -> Optional[OAuth2Session]:
+        """:class:`OAuth2Session` of the default transport."""
+        return getattr(self.transport, "session", None)
+
     def __enter__(self) -> API:
-        if not self.session:
+        if not self._opened:
             self.open()
 
         return self
@@ -59,38 +157,45 @@ class API:
 
     def open(self) -> None:
         self.close()
-        self.session = self._create_session()
+        self.transport.open(self)
+        self._opened = True
 
     def close(self) -> None:
-        if self.session:
-            self.session.close()
-            self.session = None
-
-    def _create_session(self) -> OAuth2Session:
-        extra: Optional[Dict[str, Any]]
-        if self.client_id and self.client_secret:
-            extra = {
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-            }
-        else:
-            extra = None
+        if self._opened:
+            self.transport.close()
+            self._opened = False
 
-        def update_token(newtoken: str) -> None:
-            self.token = newtoken
+    def profile(self) -> Profile:
+        """Return a :class:`~raindropio.profile.Profile` to record timings
+        of requests and model access while used as a context manager::
 
-        if isinstance(self.token, str):
-            token = {"access_token": self.token}
-        else:
-            token = self.token
-
-        return OAuth2Session(
-            self.client_id,
-            token=token,
-            auto_refresh_kwargs=extra,
-            auto_refresh_url=self.URL_REFRESH,
-            token_updater=update_token,
-        )
+            with api.profile() as profile:
+                ...
+            profile.report()
+        """
+
+        from .profile import Profile
+
+        return Profile(self)
+
+    def deadline(self, seconds: float) -> ContextManager[None]:
+        """Return a context manager to complete requests in the block within
+        ``seconds``, or raise
+        :class:`~raindropio.resilience.DeadlineExceeded`::
+
+            with api.deadline(10):
+                Collection.get_roots(api)
+        """
+
+        from .resilience import deadline
+
+        return deadline(seconds)
+
+    @property
+    def stale(self) -> bool:
+        """True if the last response of this thread was returned from the
+        cache of :class:`~raindropio.resilience.CircuitBreaker`."""
+        return bool(getattr(self._local, "stale", False))
 
     def _json_unknown(self, obj: Any) -> Any:
         if isinstance(obj, enum.Enum):
@@ -130,14 +235,111 @@ class API:
 
         resp.raise_for_status()
 
+    def wait_ratelimit(self) -> None:
+        """Block until the rate limit is reset if no request remains.
+
+        Threads sharing this object share the rate limit reported by the
+        server.
+        """
+
+        if self.ratelimit_remaining != 0 or self.ratelimit_reset is None:
+            return
+
+        delay = self.ratelimit_reset - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        self.ratelimit_remaining = None
+
     def _request_headers(self) -> Dict[str, str]:
         return {
             "Content-Type": "application/json",
         }
 
-    def get(
-        self, url: str, params: Optional[Dict[Any, Any]] = None
-    ) -> requests.models.Response:
+    def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[Any, Any]] = None,
+        data: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> Response:
+        assert self._opened
+        request_headers = self._request_headers()
+        if headers:
+            request_headers.update(headers)
+
+        from .resilience import remaining
+
+        # Fail before waiting for the scheduler if the deadline has passed.
+        remaining(self.timeout)
+
+        def send() -> Response:
+            if self.scheduler is None:
+                timeout = remaining(self.timeout)
+                return self._send(
+                    method, url, params, data, request_headers, stream, timeout
+                )
+
+            lane = self.scheduler.acquire()
+            try:
+                # Time waited in the scheduler counts against the deadline.
+                timeout = remaining(self.timeout)
+                return self._send(
+                    method, url, params, data, request_headers, stream, timeout
+                )
+            finally:
+                self.scheduler.release(lane, self)
+
+        if self.breaker is None:
+            return send()
+
+        ret = self.breaker.call(
+            method,
+            url,
+            params,
+            send,
+            cacheable=not stream,
+            token=_access_token(self),
+        )
+        self._local.stale = getattr(ret, "stale", False)
+        return ret
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[Any, Any]],
+        data: Any,
+        request_headers: Dict[str, str],
+        stream: bool,
+        timeout: Optional[float],
+    ) -> Response:
+        if self._profile is not None:
+            ret = self._profile.request(
+                self.transport,
+                method,
+                url,
+                headers=request_headers,
+                params=params,
+                data=data,
+                stream=stream,
+                timeout=timeout,
+            )
+        else:
+            ret = self.transport.request(
+                method,
+                url,
+                headers=request_headers,
+                params=params,
+                data=data,
+                stream=stream,
+                timeout=timeout,
+            )
+        self._on_resp(ret)
+        return ret
+
+    def get(self, url: str, params: Optional[Dict[Any, Any]] = None) -> Response:
         """Send a GET request
 
         :param url: The url to send request
@@ -150,32 +352,192 @@ class API:
         :rtype: :class:`requests.Response`
         """
 
-        assert self.session
-        ret = self.session.get(url, headers=self._request_headers(), params=params)
-        self._on_resp(ret)
+        if not self.coalesce:
+            return self._request("GET", url, params=params)
 
-        return ret
+        key = (
+            _access_token(self),
+            url,
+            json.dumps(params, sort_keys=True, default=str),
+        )
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            from .resilience import DeadlineExceeded, remaining
+
+            if not flight.done.wait(remaining(None)):
+                raise DeadlineExceeded("Deadline exceeded")
+            if flight.error is not None:
+                raise flight.error
+            assert flight.result is not None
+            self._local.stale = getattr(flight.result, "stale", False)
+            return flight.result
+
+        try:
+            flight.result = self._request("GET", url, params=params)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def aget(self, url: str, params: Optional[Dict[Any, Any]] = None) -> Response:
+        """Send a GET request from a coroutine.
+
+        The request is sent in the default executor of the running event
+        loop, and shares the response with identical requests in progress.
+        """
 
-    def put(self, url: str, json: Any = None) -> requests.models.Response:
-        json = self._to_json(json)
+        import asyncio
+        from contextvars import copy_context
 
-        assert self.session
-        ret = self.session.put(url, headers=self._request_headers(), data=json)
-        self._on_resp(ret)
-        return ret
+        # Run in a copy of the context, so that lane() applies to the request.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, copy_context().run, functools.partial(self.get, url, params)
+        )
 
-    def post(self, url: str, json: Any = None) -> requests.models.Response:
-        json = self._to_json(json)
+    def iter_items(
+        self,
+        url: str,
+        params: Optional[Dict[Any, Any]] = None,
+        key: str = "items",
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[Dict[str, Any]]:
+        """Send a GET request and yield entries of the ``key`` array in the
+        response as they are received.
+
+        If `ijson <https://pypi.org/project/ijson/>`_ is installed, the body
+        is parsed incrementally, so memory used is bounded by the size of an
+        entry. Otherwise the body is parsed after it is downloaded.
+
+        The response is compressed if the HTTP library supports it; install
+        ``brotli`` and ``zstandard`` to accept ``br`` and ``zstd``.
+        """
 
-        assert self.session
-        ret = self.session.post(url, headers=self._request_headers(), data=json)
-        self._on_resp(ret)
-        return ret
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+
+        resp = self._request("GET", url, params=params, stream=True)
+        try:
+            if ijson is None:
+                yield from resp.json()[key]
+                return
+
+            items = ijson.sendable_list()
+            coro = ijson.items_coro(items, f"{key}.item", use_float=True)
+            for chunk in self.transport.iter_content(resp, chunk_size):
+                coro.send(chunk)
+                yield from items
+                del items[:]
+            coro.close()
+            yield from items
+        finally:
+            resp.close()
+
+    def download(
+        self,
+        url: str,
+        path: str,
+        resume: bool = True,
+        expected_size: Optional[int] = None,
+        chunk_size: int = 1024 * 1024,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> int:
+        """Download the response body of a GET request to the file.
+
+        The body is written to ``path + ".part"`` in chunks, and renamed to
+        ``path`` when the download completes.
+
+        :param resume: If True, skip the download if ``path`` exists, and
+            request the rest of the body if the ``.part`` file exists.
+        :param expected_size: (optional) Raise :class:`IOError` if the size
+            of the file, including an existing ``path``, differs.
+        :param progress: (optional) Called with bytes written and the total
+            size.
+        :return: The size of the file.
+        """
 
-    def delete(self, url: str, json: Any = None) -> requests.models.Response:
-        json = self._to_json(json)
+        if resume and os.path.exists(path):
+            size = os.path.getsize(path)
+            if expected_size is not None and size != expected_size:
+                raise IOError(f"{path} is {size} bytes, expected {expected_size} bytes")
+            return size
 
-        assert self.session
-        ret = self.session.delete(url, headers=self._request_headers(), data=json)
-        self._on_resp(ret)
-        return ret
+        partial = path + ".part"
+        offset = os.path.getsize(partial) if resume and os.path.exists(partial) else 0
+
+        headers = {}
+        if offset and (expected_size is None or offset < expected_size):
+            headers["Range"] = f"bytes={offset}-"
+
+        if offset and not headers:
+            total: Optional[int] = offset
+        else:
+            try:
+                resp = self._request("GET", url, headers=headers, stream=True)
+            except Exception as e:
+                error = getattr(e, "response", None)
+                if not headers or getattr(error, "status_code", None) != 416:
+                    raise
+                # Nothing follows the offset; the .part file may be complete,
+                # which is verified against the total size below.
+                assert error is not None
+                total = _range_total(error.headers)
+            else:
+                try:
+                    if resp.status_code != 206:
+                        offset = 0
+
+                    total = _range_total(resp.headers)
+                    if (
+                        total is None
+                        and resp.headers.get("Content-Length", "").isdigit()
+                    ):
+                        total = offset + int(resp.headers["Content-Length"])
+
+                    with open(partial, "ab" if offset else "wb") as f:
+                        for chunk in self.transport.iter_content(resp, chunk_size):
+                            f.write(chunk)
+                            offset += len(chunk)
+                            if progress is not None:
+                                progress(offset, total)
+                finally:
+                    resp.close()
+
+        size = os.path.getsize(partial)
+        for expected in (total, expected_size):
+            if expected is not None and size != expected:
+                raise IOError(f"Downloaded {size} bytes, expected {expected} bytes")
+
+        os.replace(partial, path)
+        return size
+
+    def put(self, url: str, json: Any = None) -> Response:
+        return self._request("PUT", url, data=self._to_json(json))
+
+    def put_multipart(self, url: str, body: MultipartEncoder) -> Response:
+        """Send a PUT request with ``multipart/form-data`` body.
+
+        The body is streamed to the server.
+        """
+
+        headers = {"Content-Type": body.content_type}
+        if body.len is not None:
+            headers["Content-Length"] = str(body.len)
+        return self._request("PUT", url, data=body, headers=headers)
+
+    def post(self, url: str, json: Any = None) -> Response:
+        return self._request("POST", url, data=self._to_json(json))
+
+    def delete(self, url: str, json: Any = None) -> Response:
+        return self._request("DELETE", url, data=self._to_json(json))
@@ -0,0 +1,568 @@
+"""Command line interface for bulk operations.
+
+::
+
+    $ export RAINDROP_TOKEN=...
+    $ raindropio export -o raindrops.ndjson
+    $ raindropio dedup raindrops.ndjson > duplicates.ndjson
+    $ raindropio tag --add archived --state tag.state duplicates.ndjson
+    $ raindropio sync raindrops.ndjson
+
+Input files are NDJSON or JSON arrays of raindrops, as written by
+``export``. Commands reading raindrop ids also accept bare integers.
+``tag``, ``move``, ``import`` and ``dedup --remove`` write a result line per
+raindrop, and record completed items to the ``--state`` file, so that an
+interrupted run skips them when restarted with the same state file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import copy_context
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .api import API
+from .models import CollectionRef, Raindrop, SearchQuery, SortOrder, dateparse
+
+__all__ = ["main"]
+
+#: Raindrops updated with a single request by ``move`` and ``tag --add``.
+BATCH_SIZE = 100
+
+
+@contextlib.contextmanager
+def _output(path: Optional[str]) -> Iterator[IO[str]]:
+    if path is None or path == "-":
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        yield f
+
+
+def _write(out: IO[str], obj: Any) -> None:
+    out.write(json.dumps(obj, ensure_ascii=False, default=str) + "\n")
+
+
+def read_items(path: str) -> Iterator[Any]:
+    """Read objects from an NDJSON file or a JSON array. ``-`` is stdin."""
+
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        line = f.readline()
+        while line and not line.strip():
+            line = f.readline()
+        if line.lstrip().startswith("["):
+            yield from json.loads(line + f.read())
+            return
+
+        while line:
+            if line.strip():
+                yield json.loads(line)
+            line = f.readline()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _item_id(item: Any) -> int:
+    if isinstance(item, dict):
+        return int(item["_id"] if "_id" in item else item["id"])
+    return int(item)
+
+
+class _State:
+    """Keys of completed items, appended to a file as they complete."""
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.done: Set[str] = set()
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+        if path is None:
+            return
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done.update(line.rstrip("\n") for line in f)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.done
+
+    def add(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self.done.add(key)
+                if self._file is not None:
+                    self._file.write(key + "\n")
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class _Progress:
+    """Writes the number of completed items to stderr."""
+
+    INTERVAL = 0.5
+
+    def __init__(self, label: str, total: Optional[int], quiet: bool) -> None:
+        self.label = label
+        self.total = total
+        self.quiet = quiet
+        self.count = 0
+        self.errors = 0
+        self._last = 0.0
+
+    def update(self, n: int = 1, errors: int = 0) -> None:
+        self.count += n
+        self.errors += errors
+        now = time.monotonic()
+        if now - self._last >= self.INTERVAL:
+            self._last = now
+            self._show("\r")
+
+    def _show(self, end: str) -> None:
+        if self.quiet:
+            return
+        total = f"/{self.total}" if self.total is not None else ""
+        errors = f", {self.errors} failed" if self.errors else ""
+        sys.stderr.write(f"{end}{self.label}: {self.count}{total}{errors}")
+        sys.stderr.flush()
+
+    def close(self) -> None:
+        self._show("\r")
+        if not self.quiet:
+            sys.stderr.write("\n")
+
+
+def _run(
+    api: API,
+    args: argparse.Namespace,
+    label: str,
+    tasks: Sequence[Tuple[List[str], Callable[[], List[Dict[str, Any]]]]],
+    out: IO[str],
+) -> int:
+    """Run ``tasks`` concurrently and write their results.
+
+    Each task is a tuple of the state keys it completes and a function
+    returning result objects. Tasks whose keys are all in the state file
+    are skipped.
+    """
+
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    state = _State(args.state)
+    todo = [(keys, func) for keys, func in tasks if not all(k in state for k in keys)]
+    progress = _Progress(label, sum(len(keys) for keys, _ in todo), args.quiet)
+
+    def call(func: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        api.wait_ratelimit()
+        return func()
+
+    failed = 0
+    try:
+        with ThreadPoolExecutor(args.workers) as executor:
+            futures = {
+                executor.submit(copy_context().run, call, func): keys
+                for keys, func in todo
+            }
+            for future in as_completed(futures):
+                keys = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    failed += len(keys)
+                    for key in keys:
+                        _write(out, {"key": key, "error": str(e)})
+                    progress.update(len(keys), len(keys))
+                else:
+                    state.add(keys)
+                    for result in results:
+                        _write(out, result)
+                    progress.update(len(keys))
+    finally:
+        progress.close()
+        state.close()
+
+    return 1 if failed else 0
+
+
+def _batches(ids: Sequence[int], size: int) -> Iterator[List[int]]:
+    for i in range(0, len(ids), size):
+        yield list(ids[i : i + size])
+
+
+def _bulk_tasks(
+    api: API, ids: Sequence[int], **kwargs: Any
+) -> List[Tuple[List[str], Callable[[], List[Dict[str, Any]]]]]:
+    def task(batch: List[int]) -> Callable[[], List[Dict[str, Any]]]:
+        def run() -> List[Dict[str, Any]]:
+            Raindrop.update_many(api, batch, **kwargs)
+            return [{"id": id, "ok": True} for id in batch]
+
+        return run
+
+    return [
+        ([str(id) for id in batch], task(batch)) for batch in _batches(ids, BATCH_SIZE)
+    ]
+
+
+def _export(
+    api: API, args: argparse.Namespace, query: Optional[SearchQuery] = None
+) -> Iterator[Raindrop]:
+    query = query or SearchQuery()
+    if args.word:
+        query = query.word(args.word)
+    for tag in args.tag or ():
+        query = query.tag(tag)
+
+    return Raindrop.search_collections(
+        api,
+        args.collection or [CollectionRef.All],
+        sort=SortOrder.created_desc,
+        perpage=50,
+        max_workers=args.workers,
+        query=query,
+        nested=args.nested or None,
+    )
+
+
+def cmd_export(api: API, args: argparse.Namespace) -> int:
+    progress = _Progress("export", None, args.quiet)
+    with _output(args.output) as out:
+        try:
+            if args.json:
+                out.write("[")
+            for n, raindrop in enumerate(_export(api, args)):
+                if args.json:
+                    out.write(",\n" if n else "\n")
+                    out.write(json.dumps(raindrop.values, ensure_ascii=False))
+                else:
+                    _write(out, raindrop.values)
+                progress.update()
+            if args.json:
+                out.write("\n]\n")
+        finally:
+            progress.close()
+    return 0
+
+
+_IMPORT_FIELDS = (
+    "created",
+    "lastUpdate",
+    "important",
+    "tags",
+    "media",
+    "cover",
+    "type",
+    "excerpt",
+    "title",
+    "highlights",
+)
+
+
+def cmd_import(api: API, args: argparse.Namespace) -> int:
+    def task(item: Any) -> Callable[[], List[Dict[str, Any]]]:
+        def run() -> List[Dict[str, Any]]:
+            if not isinstance(item, dict) or not item.get("link"):
+                raise ValueError("The item has no link")
+            kwargs = {k: item[k] for k in _IMPORT_FIELDS if item.get(k) is not None}
+            if args.collection is not None:
+                kwargs["collection"] = args.collection
+            raindrop = Raindrop.create(
+                api, item["link"], pleaseParse=args.parse, **kwargs
+            )
+            return [{"id": raindrop.id, "link": raindrop.link, "ok": True}]
+
+        return run
+
+    def key(n: int, item: Any) -> str:
+        if isinstance(item, dict) and item.get("link"):
+            return str(item["link"])
+        return f"#{n}"
+
+    tasks = [
+        ([key(n, item)], task(item)) for n, item in enumerate(read_items(args.input))
+    ]
+    with _output(args.output) as out:
+        return _run(api, args, "import", tasks, out)
+
+
+def cmd_tag(api: API, args: argparse.Namespace) -> int:
+    add = args.add or []
+    remove = set(args.remove or [])
+    items = list(read_items(args.input))
+
+    if not remove:
+        # update_many appends tags to the existing tags.
+        tasks = _bulk_tasks(api, [_item_id(item) for item in items], tags=add)
+    else:
+
+        def task(item: Any) -> Callable[[], List[Dict[str, Any]]]:
+            def run() -> List[Dict[str, Any]]:
+                id = _item_id(item)
+                if args.trust_input and isinstance(item, dict) and "tags" in item:
+                    tags = list(item["tags"])
+                else:
+                    # Tags in the input may be older than the server's.
+                    tags = list(Raindrop.get(api, id).tags)
+
+                new = [t for t in tags if t not in remove]
+                new += [t for t in add if t not in new]
+                if new == tags:
+                    return [{"id": id, "ok": True, "unchanged": True}]
+                Raindrop.update(api, id, tags=new)
+                return [{"id": id, "ok": True, "tags": new}]
+
+            return run
+
+        tasks = [([str(_item_id(item))], task(item)) for item in items]
+
+    with _output(args.output) as out:
+        return _run(api, args, "tag", tasks, out)
+
+
+def cmd_move(api: API, args: argparse.Namespace) -> int:
+    ids = [_item_id(item) for item in read_items(args.input)]
+    tasks = _bulk_tasks(api, ids, collection=args.to)
+    with _output(args.output) as out:
+        return _run(api, args, "move", tasks, out)
+
+
+def normalize_link(link: str) -> str:
+    """Return the key to find duplicated links: the scheme and host are
+    lower cased, and the fragment and trailing slash are removed."""
+
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(link.strip())
+    path = parts.path.rstrip("/")
+    return parts._replace(
+        scheme=parts.scheme.lower(),
+        netloc=parts.netloc.lower(),
+        path=path,
+        fragment="",
+    ).geturl()
+
+
+def find_duplicates(items: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield raindrops whose link was seen in an older raindrop, with
+    ``duplicate_of`` set to the id of the oldest one."""
+
+    def created(item: Dict[str, Any]) -> Tuple[int, Any]:
+        value = item.get("created")
+        return (0, dateparse(value)) if value else (1, None)
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        if item.get("link"):
+            groups.setdefault(normalize_link(item["link"]), []).append(item)
+
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        group.sort(key=created)
+        original = group[0]["_id"]
+        for item in group[1:]:
+            yield {"_id": item["_id"], "link": item["link"], "duplicate_of": original}
+
+
+def cmd_dedup(api: Optional[API], args: argparse.Namespace) -> int:
+    duplicates = list(find_duplicates(read_items(args.input)))
+
+    with _output(args.output) as out:
+        if not args.remove:
+            for item in duplicates:
+                _write(out, item)
+            return 0
+
+        assert api is not None
+
+        def task(item: Dict[str, Any]) -> Callable[[], List[Dict[str, Any]]]:
+            def run() -> List[Dict[str, Any]]:
+                Raindrop.remove(api, item["_id"])
+                return [{**item, "ok": True}]
+
+            return run
+
+        tasks = [([str(item["_id"])], task(item)) for item in duplicates]
+        return _run(api, args, "dedup", tasks, out)
+
+
+def cmd_sync(api: API, args: argparse.Namespace) -> int:
+    items: Dict[int, Dict[str, Any]] = {}
+    if os.path.exists(args.file):
+        for item in read_items(args.file):
+            items[item["_id"]] = item
+
+    query = SearchQuery()
+    updates = [item["lastUpdate"] for item in items.values() if item.get("lastUpdate")]
+    if updates:
+        # The server compares dates without time, so fetch the last day again.
+        since = max(dateparse(u) for u in updates) - datetime.timedelta(days=1)
+        query = query.lastUpdate(after=since)
+
+    progress = _Progress("sync", None, args.quiet)
+    changed = 0
+    try:
+        for raindrop in _export(api, args, query):
+            old = items.get(raindrop.id)
+            if old is None or old.get("lastUpdate") != raindrop.values.get(
+                "lastUpdate"
+            ):
+                items[raindrop.id] = raindrop.values
+                changed += 1
+            progress.update()
+    finally:
+        progress.close()
+
+    tmp = args.file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as out:
+        for item in items.values():
+            _write(out, item)
+    os.replace(tmp, args.file)
+
+    if not args.quiet:
+        sys.stderr.write(f"sync: {changed} updated, {len(items)} total\n")
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="raindropio", description="Bulk operations on Raindrop.io."
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("RAINDROP_TOKEN"),
+        help="access token (default: $RAINDROP_TOKEN)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=4, help="concurrent requests"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report progress"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def command(name: str, help: str, inputs: bool = True) -> argparse.ArgumentParser:
+        p = sub.add_parser(name, help=help, description=help)
+        if inputs:
+            p.add_argument("input", help="NDJSON or JSON file, or - for stdin")
+        p.add_argument("-o", "--output", help="output file (default: stdout)")
+        return p
+
+    def resumable(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--state", help="file to record completed items to resume")
+
+    def search(p: argparse.ArgumentParser) -> None:
+        p.add_argument(
+            "-c",
+            "--collection",
+            type=int,
+            action="append",
+            help="collection id, may be repeated (default: all)",
+        )
+        p.add_argument(
+            "--nested", action="store_true", help="include nested collections"
+        )
+        p.add_argument("--word", help="search word")
+        p.add_argument("--tag", action="append", help="search tag")
+
+    p = command("export", "write raindrops as NDJSON", inputs=False)
+    search(p)
+    p.add_argument("--json", action="store_true", help="write a JSON array")
+    p.set_defaults(func=cmd_export)
+
+    p = command("import", "create raindrops from exported raindrops")
+    p.add_argument("-c", "--collection", type=int, help="collection to create in")
+    p.add_argument(
+        "--parse", action="store_true", help="let the server parse the pages"
+    )
+    resumable(p)
+    p.set_defaults(func=cmd_import)
+
+    p = command("tag", "add or remove tags of raindrops")
+    p.add_argument("--add", action="append", help="tag to add")
+    p.add_argument("--remove", action="append", help="tag to remove")
+    p.add_argument(
+        "--trust-input",
+        action="store_true",
+        help="with --remove, use the tags in the input instead of reading them",
+    )
+    resumable(p)
+    p.set_defaults(func=cmd_tag)
+
+    p = command("move", "move raindrops to a collection")
+    p.add_argument("--to", type=int, required=True, help="collection id")
+    resumable(p)
+    p.set_defaults(func=cmd_move)
+
+    p = command("dedup", "find raindrops with duplicated links, offline")
+    p.add_argument(
+        "--remove", action="store_true", help="remove the duplicates to Trash"
+    )
+    resumable(p)
+    p.set_defaults(func=cmd_dedup, offline=True)
+
+    p = sub.add_parser(
+        "sync",
+        help="update an exported NDJSON file with changed raindrops",
+        description="Update an exported NDJSON file with raindrops changed "
+        "since the file was written. Removed raindrops are not detected.",
+    )
+    p.add_argument("file", help="NDJSON file written by export")
+    search(p)
+    p.set_defaults(func=cmd_sync)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None, api: Optional[API] = None) -> int:
+    """Run the command line interface.
+
+    :param argv: (optional) Arguments. Defaults to ``sys.argv[1:]``.
+    :param api: (optional) :class:`API` to use instead of creating one from
+        ``--token``.
+    :return: Exit status; 1 if some items failed.
+    """
+
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "tag" and not (args.add or args.remove):
+        parser.error("tag: --add or --remove is required")
+
+    offline = getattr(args, "offline", False) and not getattr(args, "remove", False)
+    if api is None and not offline:
+        if not args.token:
+            parser.error("--token or $RAINDROP_TOKEN is required")
+        api = API(args.token)
+
+    ret: int = args.func(api, args)
+    return ret
+
+
+if __name__ == "__main__":
+    sys.exit(main())
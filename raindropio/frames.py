@@ -0,0 +1,235 @@
+"""Convert raindrops and collections to Apache Arrow tables and pandas
+DataFrames.
+
+Columns are built from the source dictionaries of the objects, without
+accessing the model attributes. Dates are parsed by Arrow for each column
+at once, and ``domain``, ``type``, ``view`` and ``tags`` are dictionary
+encoded (``category`` dtype in pandas).
+
+::
+
+    table = to_arrow(Raindrop.search(api, collection=CollectionRef.All))
+    df = to_pandas(Raindrop.search_collections(api, collections))
+
+    for batch in iter_batches(raindrops, chunk_size=10000):
+        writer.write_batch(batch)
+
+Requires ``pyarrow``, and ``pandas`` for :func:`to_pandas`. Install them
+with ``pip install python-raindropio[arrow]``.
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .models import Collection, DictModel, Raindrop, dateparse
+
+if TYPE_CHECKING:
+    import pandas
+    import pyarrow
+
+__all__ = ["iter_batches", "schema", "to_arrow", "to_pandas"]
+
+_Item = Union[DictModel, Dict[str, Any]]
+_Model = Union[Type[Raindrop], Type[Collection]]
+
+# (column name, key of the source dictionary, kind)
+_COLUMNS: Dict[_Model, Tuple[Tuple[str, str, str], ...]] = {
+    Raindrop: (
+        ("id", "_id", "int"),
+        ("collection", "collection", "ref"),
+        ("title", "title", "string"),
+        ("excerpt", "excerpt", "string"),
+        ("link", "link", "string"),
+        ("domain", "domain", "category"),
+        ("type", "type", "category"),
+        ("tags", "tags", "tags"),
+        ("cover", "cover", "string"),
+        ("important", "important", "bool"),
+        ("broken", "broken", "bool"),
+        ("created", "created", "timestamp"),
+        ("lastUpdate", "lastUpdate", "timestamp"),
+    ),
+    Collection: (
+        ("id", "_id", "int"),
+        ("parent", "parent", "ref"),
+        ("title", "title", "string"),
+        ("count", "count", "int"),
+        ("color", "color", "string"),
+        ("public", "public", "bool"),
+        ("expanded", "expanded", "bool"),
+        ("sort", "sort", "int"),
+        ("view", "view", "category"),
+        ("created", "created", "timestamp"),
+        ("lastUpdate", "lastUpdate", "timestamp"),
+    ),
+}
+
+
+def _types() -> Dict[str, pyarrow.DataType]:
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    return {
+        "int": pa.int64(),
+        "ref": pa.int64(),
+        "string": pa.string(),
+        "category": category,
+        "tags": pa.list_(category),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+    }
+
+
+def schema(model: _Model) -> pyarrow.Schema:
+    """Return the Arrow schema of ``model``, :class:`Raindrop` or
+    :class:`Collection`."""
+
+    import pyarrow as pa
+
+    types = _types()
+    return pa.schema(
+        [(name, types[kind]) for name, _, kind in _COLUMNS[model]],
+    )
+
+
+def _ref(value: Any) -> Optional[int]:
+    if isinstance(value, dict):
+        return value.get("$id")
+    return None
+
+
+def _timestamps(values: List[Optional[str]]) -> pyarrow.Array:
+    import pyarrow as pa
+
+    type = pa.timestamp("ms", tz="UTC")
+    strings = pa.array(values, pa.string())
+    try:
+        return strings.cast(type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # Formats Arrow can not parse are parsed one by one.
+        return pa.array([dateparse(v) if v else None for v in values], type)
+
+
+def _tags(values: List[Any]) -> pyarrow.Array:
+    import pyarrow as pa
+
+    offsets = [0]
+    flat: List[str] = []
+    for tags in values:
+        if tags:
+            flat.extend(tags)
+        offsets.append(len(flat))
+    return pa.ListArray.from_arrays(
+        pa.array(offsets, pa.int32()),
+        pa.array(flat, pa.string()).dictionary_encode(),
+    )
+
+
+def _column(kind: str, values: List[Any], types: Dict[str, Any]) -> pyarrow.Array:
+    import pyarrow as pa
+
+    if kind == "timestamp":
+        return _timestamps(values)
+    if kind == "tags":
+        return _tags(values)
+    if kind == "ref":
+        return pa.array([_ref(v) for v in values], types[kind])
+    if kind == "category":
+        return pa.array(values, pa.string()).dictionary_encode()
+    return pa.array(values, types[kind])
+
+
+def _values(item: _Item) -> Dict[str, Any]:
+    if isinstance(item, DictModel):
+        return item.values
+    return item
+
+
+def _model_of(item: _Item) -> _Model:
+    for model in _COLUMNS:
+        if isinstance(item, model):
+            return model
+    raise TypeError(
+        f"Can not convert {type(item).__name__}; pass Raindrop or Collection "
+        f"as model"
+    )
+
+
+def iter_batches(
+    items: Iterable[_Item],
+    model: Optional[_Model] = None,
+    chunk_size: int = 65536,
+) -> Iterator[pyarrow.RecordBatch]:
+    """Convert ``items`` to :class:`pyarrow.RecordBatch` objects of up to
+    ``chunk_size`` rows, consuming the iterable a chunk at a time.
+
+    :param items: :class:`Raindrop` or :class:`Collection` objects, or their
+        source dictionaries.
+    :param model: (optional) :class:`Raindrop` or :class:`Collection`.
+        Required if ``items`` are dictionaries.
+    """
+
+    import pyarrow as pa
+
+    types = _types()
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if not chunk:
+            return
+        if model is None:
+            model = _model_of(chunk[0])
+
+        rows = [_values(item) for item in chunk]
+        columns = _COLUMNS[model]
+        arrays = [
+            _column(kind, [row.get(key) for row in rows], types)
+            for _, key, kind in columns
+        ]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema(model))
+
+
+def to_arrow(
+    items: Iterable[_Item],
+    model: Optional[_Model] = None,
+    chunk_size: int = 65536,
+) -> pyarrow.Table:
+    """Convert ``items`` to a :class:`pyarrow.Table`.
+
+    See :func:`iter_batches` for the parameters. An empty ``items`` returns
+    an empty table with the schema of ``model``, or :class:`Raindrop`.
+    """
+
+    import pyarrow as pa
+
+    batches = list(iter_batches(items, model, chunk_size))
+    if batches:
+        return pa.Table.from_batches(batches)
+    return schema(model or Raindrop).empty_table()
+
+
+def to_pandas(
+    items: Iterable[_Item],
+    model: Optional[_Model] = None,
+    chunk_size: int = 65536,
+) -> pandas.DataFrame:
+    """Convert ``items`` to a :class:`pandas.DataFrame`.
+
+    Dictionary encoded columns become ``category`` columns, and dates
+    become timezone aware ``datetime64`` columns.
+    """
+
+    return to_arrow(items, model, chunk_size).to_pandas()
@@ -1,26 +1,57 @@
 from __future__ import annotations
 
+import copy
 import datetime
 import enum
 import json
-from typing import Any, ClassVar, Dict, List, Optional, Sequence, Union
-
-from dateutil.parser import parse as dateparse
-from jashin.dictattr import DictModel, ItemAttr, SequenceAttr
+from contextvars import copy_context
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from jashin.dictattr import DictModel, ItemAttr, ItemAttrBase, SequenceAttr
+from jashin.omit import OMIT
 
 from .api import API
+from .multipart import FileLike, MultipartEncoder, Progress, open_file
 
 __all__ = [
     "Access",
     "AccessLevel",
     "BrokenLevel",
+    "Cache",
+    "CacheStatus",
     "Collection",
     "CollectionRef",
+    "CollectionSort",
+    "ConflictError",
     "DictModel",
+    "File",
     "FontColor",
     "Group",
+    "Highlight",
+    "Model",
     "Raindrop",
     "RaindropType",
+    "SearchQuery",
+    "SortOrder",
+    "Stats",
     "User",
     "UserConfig",
     "UserFiles",
@@ -29,6 +60,199 @@ __all__ = [
 ]
 
 
+def dateparse(value: str) -> datetime.datetime:
+    """Parse a date string in the API response.
+
+    ``dateutil`` is imported on the first call to speed up start up.
+    """
+    from dateutil.parser import parse
+
+    return parse(value)
+
+
+_fields: Dict[Type[DictModel], Dict[str, ItemAttrBase[Any]]] = {}
+
+
+def _get_fields(model: Type[DictModel]) -> Dict[str, ItemAttrBase[Any]]:
+    """Map attribute names of ``model`` to their descriptors."""
+
+    ret = _fields.get(model)
+    if ret is None:
+        ret = {}
+        for klass in reversed(model.__mro__):
+            for name, attr in vars(klass).items():
+                if isinstance(attr, ItemAttrBase):
+                    ret[name] = attr
+        _fields[model] = ret
+    return ret
+
+
+_projections: Dict[Tuple[Type[DictModel], Tuple[str, ...]], Tuple[Any, ...]] = {}
+
+D = TypeVar("D", bound=DictModel)
+
+
+def _projection(
+    model: Type[D], fields: Tuple[str, ...]
+) -> Tuple[Tuple[str, ...], Type[D]]:
+    """Return keys of the source dictionary used by ``fields``, and a
+    subclass of ``model`` whose other attributes raise ValueError even if
+    they have a default."""
+
+    ret = _projections.get((model, fields))
+    if ret is not None:
+        return ret
+
+    attrs = _get_fields(model)
+    keys = []
+    for field in fields:
+        attr = attrs.get(field)
+        if attr is None:
+            raise ValueError(f"{model.__name__} has no field {field!r}")
+        assert attr.name
+        keys.append(attr.name)
+
+    hidden: Dict[str, Any] = {}
+    for name, attr in attrs.items():
+        if attr.name not in keys and attr.default is not OMIT:
+            hidden[name] = copy.copy(attr)
+            hidden[name].default = OMIT
+    projected = type(
+        model.__name__,
+        (model,),
+        {
+            "__module__": model.__module__,
+            "__qualname__": model.__qualname__,
+            "_base": model,
+            **hidden,
+        },
+    )
+    _projections[(model, fields)] = ret = (tuple(keys), projected)
+    return ret
+
+
+def _project(
+    model: Type[D], item: Dict[str, Any], fields: Optional[Sequence[str]]
+) -> D:
+    """Return ``model`` of ``item`` reduced to the keys used by ``fields``."""
+
+    if fields is None:
+        return model(item)
+    keys, projected = _projection(model, tuple(fields))
+    return projected({key: item[key] for key in keys if key in item})
+
+
+def _prefetched(api: API, model: Any, id: int) -> Optional[Dict[str, Any]]:
+    if api.prefetcher is None:
+        return None
+    return api.prefetcher.lookup(model, id)
+
+
+def _invalidate(api: API, model: Any, id: Optional[int] = None) -> None:
+    """Discard the prefetched item, or all items of the model if ``id`` is
+    None."""
+    if api.prefetcher is not None:
+        if id is None:
+            api.prefetcher.invalidate_all(model)
+        else:
+            api.prefetcher.invalidate(model, id)
+
+
+def _collection_id(item: Dict[str, Any]) -> int:
+    """The collection id of the raindrop in the response."""
+    ref = item.get("collection")
+    return int(ref["$id"]) if ref else -1
+
+
+def _stats_moved(
+    api: API, source: Optional[int], target: Optional[int], n: int = 1
+) -> None:
+    if api.stats_cache is not None:
+        api.stats_cache.moved(source, target, n)
+
+
+def _stats_invalidate(api: API) -> None:
+    if api.stats_cache is not None:
+        api.stats_cache.invalidate()
+
+
+class ConflictError(Exception):
+    """Raised by ``save()`` if the object was modified on the server."""
+
+
+M = TypeVar("M", bound="Model")
+
+
+class Model(DictModel):
+    """Base class of models. Tracks attributes assigned after loading.
+
+    Assigning to an attribute marks it dirty, and ``save()`` of
+    :class:`Raindrop` and :class:`Collection` sends only dirty items. Items
+    modified in place, such as ``raindrop.tags.append(tag)``, are not
+    tracked; assign the new value instead.
+    """
+
+    # Created on the first assignment, so that objects which are only read
+    # do not carry a set each.
+    _dirty: FrozenSet[str] = frozenset()
+    # Values of the dirty items when loaded.
+    _loaded: Dict[str, Any]
+    # The model of objects returned with ``fields``.
+    _base: ClassVar[Optional[Type[Model]]] = None
+
+    def _mark(self, key: str) -> None:
+        if "_dirty" not in self.__dict__:
+            object.__setattr__(self, "_dirty", set())
+            object.__setattr__(self, "_loaded", {})
+        if key not in self._dirty:
+            self._loaded[key] = self.values.get(key)
+            cast(Set[str], self._dirty).add(key)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        attr = _get_fields(type(self)).get(name)
+        if attr is not None:
+            assert attr.name
+            self._mark(attr.name)
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        attr = _get_fields(type(self)).get(name)
+        if attr is not None:
+            assert attr.name
+            self._mark(attr.name)
+        super().__delattr__(name)
+
+    @property
+    def dirty(self) -> FrozenSet[str]:
+        """Keys of the source dictionary modified since loaded."""
+        return frozenset(self._dirty)
+
+    def _save(self: M, api: API, url: str, check_conflict: bool) -> M:
+        if not self._dirty:
+            return self
+
+        if check_conflict:
+            # Compare with lastUpdate as loaded, even if it was assigned.
+            loaded = self._loaded.get("lastUpdate", self.values.get("lastUpdate"))
+            # Read the server rather than the prefetched copy.
+            current = api.get(url).json()["item"]
+            if current.get("lastUpdate") != loaded:
+                raise ConflictError(
+                    f"{type(self).__name__} {self.values['_id']} was modified"
+                )
+
+        args = {key: self.values[key] for key in self._dirty if key in self.values}
+        item = api.put(url, json=args).json()["item"]
+        model = type(self)._base or type(self)
+        _invalidate(api, model, self.values["_id"])
+
+        # The response has all items, so the projection no longer applies.
+        object.__setattr__(self, "__class__", model)
+        object.__setattr__(self, "values", item)
+        del self._dirty, self._loaded
+        return self
+
+
 class AccessLevel(enum.IntEnum):
     readonly = 1
     collaborator_read = 2
@@ -36,6 +260,14 @@ class AccessLevel(enum.IntEnum):
     owner = 4
 
 
+class CollectionSort(enum.Enum):
+    """Order of :meth:`Collection.reorder_all`."""
+
+    title = "title"
+    title_desc = "-title"
+    count_desc = "-count"
+
+
 class View(enum.Enum):
     list = "list"
     simple = "simple"
@@ -43,25 +275,87 @@ class View(enum.Enum):
     masonly = "masonry"
 
 
-class CollectionRef(DictModel):
+class CollectionRef:
+    """Represents reference to :class:`Collection` object.
+
+    :param values: ``{"$id": id}`` dictionary in API response, or the id.
+
+    CollectionRef objects are immutable and interned: a single object is
+    shared by every reference to the same collection, so they can be compared
+    by identity and used as dictionary keys.
+    """
+
+    __slots__ = ("id",)
+
+    #: Pseudo collection of raindrops which are not sorted to collections.
     Unsorted: ClassVar[CollectionRef]
+    #: Pseudo collection of removed raindrops.
     Trash: ClassVar[CollectionRef]
+    #: Pseudo collection of all raindrops but Trash.
+    All: ClassVar[CollectionRef]
 
-    id = ItemAttr[int](name="$id")
+    _interned: ClassVar[Dict[int, CollectionRef]] = {}
+
+    #: (:class:`int`) The id of the :class:`Collection`.
+    id: int
+
+    def __new__(cls, values: Union[Dict[str, Any], int]) -> CollectionRef:
+        id = values if isinstance(values, int) else int(values["$id"])
+        ref = cls._interned.get(id)
+        if ref is None:
+            ref = object.__new__(cls)
+            object.__setattr__(ref, "id", id)
+            ref = cls._interned.setdefault(id, ref)
+        return ref
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CollectionRef is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("CollectionRef is immutable")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (CollectionRef, (self.id,))
+
+    def __copy__(self) -> CollectionRef:
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> CollectionRef:
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CollectionRef):
+            return self.id == other.id
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"CollectionRef({self.id})"
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        """Dictionary representation in the API."""
+        return {"$id": self.id}
 
+    def __dictattr_get__(self) -> Dict[str, Any]:
+        return self.values
 
-CollectionRef.Unsorted = CollectionRef({"$id": -1})
-CollectionRef.Trash = CollectionRef({"$id": -1})
 
+CollectionRef.Unsorted = CollectionRef(-1)
+CollectionRef.Trash = CollectionRef(-99)
+CollectionRef.All = CollectionRef(0)
 
-class UserRef(DictModel):
-    """Represents reference to :class:`User` object. """
+
+class UserRef(Model):
+    """Represents reference to :class:`User` object."""
 
     #: (:class:`int`) The id of the :class:`User`.
     id = ItemAttr[int](name="$id")
 
 
-class Access(DictModel):
+class Access(Model):
     """Represents Access control of Collections"""
 
     #: (:class:`UserRef`) The user for this permission.
@@ -71,7 +365,7 @@ class Access(DictModel):
     draggable = ItemAttr[bool]()
 
 
-class Collection(DictModel):
+class Collection(Model):
     """Represents Collection"""
 
     #: (:class:`int`) The id of the collection.
@@ -95,24 +389,44 @@ class Collection(DictModel):
     view = ItemAttr(View)
 
     @classmethod
-    def get_roots(cls, api: API) -> Sequence[Collection]:
-        """Get root collections"""
+    def get_roots(
+        cls, api: API, fields: Optional[Sequence[str]] = None
+    ) -> Sequence[Collection]:
+        """Get root collections
+
+        :param fields: (optional) Names of attributes to keep. Other items of
+            the response are discarded, and accessing them raises ValueError.
+        """
         URL = "https://api.raindrop.io/rest/v1/collections"
         ret = api.get(URL)
         items = ret.json()["items"]
-        return [cls(item) for item in items]
+        return [_project(cls, item, fields) for item in items]
 
     @classmethod
-    def get_childrens(cls, api: API) -> Sequence[Collection]:
+    def get_childrens(
+        cls, api: API, fields: Optional[Sequence[str]] = None
+    ) -> Sequence[Collection]:
         URL = "https://api.raindrop.io/rest/v1/collections/childrens"
         ret = api.get(URL)
         items = ret.json()["items"]
-        return [cls(item) for item in items]
+        return [_project(cls, item, fields) for item in items]
+
+    @classmethod
+    def iter_childrens(
+        cls, api: API, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Collection]:
+        """Same as :meth:`get_childrens`, but yields collections while the
+        response is downloaded. See :meth:`API.iter_items`."""
+        URL = "https://api.raindrop.io/rest/v1/collections/childrens"
+        for item in api.iter_items(URL):
+            yield _project(cls, item, fields)
 
     @classmethod
     def get(cls, api: API, id: int) -> Collection:
-        URL = f"https://api.raindrop.io/rest/v1/collection/{id}"
-        item = api.get(URL).json()["item"]
+        item = _prefetched(api, cls, id)
+        if item is None:
+            URL = f"https://api.raindrop.io/rest/v1/collection/{id}"
+            item = api.get(URL).json()["item"]
         return cls(item)
 
     @classmethod
@@ -177,12 +491,133 @@ class Collection(DictModel):
 
         URL = f"https://api.raindrop.io/rest/v1/collection/{id}"
         item = api.put(URL, json=args).json()["item"]
+        _invalidate(api, cls, id)
         return Collection(item)
 
     @classmethod
     def remove(cls, api: API, id: int) -> None:
         URL = f"https://api.raindrop.io/rest/v1/collection/{id}"
         api.delete(URL, json={})
+        _invalidate(api, cls, id)
+        # Raindrops in the collection are moved to Trash.
+        _invalidate(api, Raindrop)
+        _stats_invalidate(api)
+
+    @classmethod
+    def update_many(
+        cls,
+        api: API,
+        updates: Union[
+            Mapping[int, Dict[str, Any]], Iterable[Tuple[int, Dict[str, Any]]]
+        ],
+        max_workers: int = 4,
+    ) -> Dict[int, Union[Collection, Exception]]:
+        """Update collections concurrently.
+
+        The server has no endpoint to update multiple collections, so
+        :meth:`update` is called for each collection by up to
+        ``max_workers`` threads, waiting for :meth:`API.wait_ratelimit`
+        before each request::
+
+            Collection.update_many(api, {100: {"parent": 200}, 101: {"sort": 1}})
+
+        :param updates: Pairs of the collection id and keyword arguments of
+            :meth:`update`.
+        :return: Dictionary of collection id to the updated
+            :class:`Collection`, or the exception raised.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if isinstance(updates, Mapping):
+            updates = updates.items()
+        items = list(updates)
+
+        def update(item: Tuple[int, Dict[str, Any]]) -> Collection:
+            id, kwargs = item
+            api.wait_ratelimit()
+            return cls.update(api, id, **kwargs)
+
+        ret: Dict[int, Union[Collection, Exception]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(copy_context().run, update, item) for item in items
+            ]
+            for (id, _), future in zip(items, futures):
+                try:
+                    ret[id] = future.result()
+                except Exception as e:
+                    ret[id] = e
+        return ret
+
+    @classmethod
+    def remove_many(cls, api: API, ids: Sequence[int]) -> None:
+        """Remove collections and their descendants with one request.
+
+        Raindrops in the collections are moved to Trash.
+        """
+        URL = "https://api.raindrop.io/rest/v1/collections"
+        api.delete(URL, json={"ids": list(ids)})
+        for id in ids:
+            _invalidate(api, cls, id)
+        _invalidate(api, Raindrop)
+        _stats_invalidate(api)
+
+    @classmethod
+    def merge(
+        cls,
+        api: API,
+        ids: Sequence[int],
+        to: Union[Collection, CollectionRef, int],
+    ) -> None:
+        """Move raindrops of collections ``ids`` to the collection ``to``,
+        and remove the collections."""
+        if isinstance(to, (Collection, CollectionRef)):
+            to = to.id
+
+        URL = "https://api.raindrop.io/rest/v1/collections/merge"
+        api.put(URL, json={"to": to, "ids": list(ids)})
+        for id in [*ids, to]:
+            _invalidate(api, cls, id)
+        _invalidate(api, Raindrop)
+        _stats_invalidate(api)
+
+    @classmethod
+    def reorder_all(cls, api: API, sort: CollectionSort) -> None:
+        """Sort all collections of the user."""
+        URL = "https://api.raindrop.io/rest/v1/collections"
+        api.put(URL, json={"sort": sort})
+        _invalidate(api, cls)
+
+    @classmethod
+    def expand_all(cls, api: API, expanded: bool = True) -> None:
+        """Expand or collapse all collections of the user."""
+        URL = "https://api.raindrop.io/rest/v1/collections"
+        api.put(URL, json={"expanded": expanded})
+        _invalidate(api, cls)
+
+    @classmethod
+    def clean_empty(cls, api: API) -> int:
+        """Remove all empty collections.
+
+        :return: The number of removed collections.
+        """
+        URL = "https://api.raindrop.io/rest/v1/collections/clean"
+        ret = api.put(URL, json={}).json()
+        _invalidate(api, cls)
+        _invalidate(api, Raindrop)
+        _stats_invalidate(api)
+        return int(ret.get("count", 0))
+
+    def save(self, api: API, check_conflict: bool = False) -> Collection:
+        """Send modified attributes to the server.
+
+        No request is sent if no attribute is modified.
+
+        :param check_conflict: If True, raise :class:`ConflictError` if
+            ``lastUpdate`` on the server differs from this object.
+        """
+        URL = f"https://api.raindrop.io/rest/v1/collection/{self.id}"
+        return self._save(api, URL, check_conflict)
 
 
 class RaindropType(enum.Enum):
@@ -194,9 +629,164 @@ class RaindropType(enum.Enum):
     audio = "audi"
 
 
-class Raindrop(DictModel):
+class SortOrder(enum.Enum):
+    """Sort order of :meth:`Raindrop.search`."""
+
+    created = "created"
+    created_desc = "-created"
+    score = "score"
+    sort = "-sort"
+    title = "title"
+    title_desc = "-title"
+    domain = "domain"
+    domain_desc = "-domain"
+
+
+# Keys of the source dictionary to merge search results in the sort order.
+_MERGE_KEYS: Dict[SortOrder, Tuple[str, Callable[[Any], Any]]] = {
+    SortOrder.created: ("created", dateparse),
+    SortOrder.created_desc: ("created", dateparse),
+    SortOrder.title: ("title", str),
+    SortOrder.title_desc: ("title", str),
+    SortOrder.domain: ("domain", str),
+    SortOrder.domain_desc: ("domain", str),
+}
+
+
+DateLike = Union[datetime.date, str]
+
+
+def _format_date(value: DateLike) -> str:
+    if isinstance(value, datetime.date):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+class SearchQuery:
+    """Builds search terms of :meth:`Raindrop.search`.
+
+    Each method returns a new :class:`SearchQuery` with the term added, so
+    queries can be composed and reused::
+
+        recent = SearchQuery().created(after=datetime.date(2020, 1, 1))
+        articles = recent.type(RaindropType.article).domain("example.com")
+        Raindrop.search(api, query=articles, sort=SortOrder.created_desc)
+    """
+
+    def __init__(self, terms: Sequence[Dict[str, Any]] = ()) -> None:
+        self.terms: Tuple[Dict[str, Any], ...] = tuple(terms)
+
+    def __repr__(self) -> str:
+        return f"<SearchQuery: {list(self.terms)!r}>"
+
+    def __add__(self, other: SearchQuery) -> SearchQuery:
+        return SearchQuery(self.terms + other.terms)
+
+    def term(self, key: str, val: Any) -> SearchQuery:
+        """Add a search term supported by the server."""
+        return SearchQuery(self.terms + ({"key": key, "val": val},))
+
+    def word(self, word: str) -> SearchQuery:
+        return self.term("word", word)
+
+    def tag(self, tag: str) -> SearchQuery:
+        return self.term("tag", tag)
+
+    def important(self, important: bool = True) -> SearchQuery:
+        return self.term("important", important)
+
+    def type(self, type: Union[RaindropType, str]) -> SearchQuery:
+        if isinstance(type, RaindropType):
+            type = type.value
+        return self.term("type", type)
+
+    def domain(self, domain: str) -> SearchQuery:
+        return self.term("domain", domain)
+
+    def broken(self, broken: bool = True) -> SearchQuery:
+        """Raindrops with broken links."""
+        return self.term("broken", broken)
+
+    def duplicate(self, duplicate: bool = True) -> SearchQuery:
+        """Raindrops with duplicated links."""
+        return self.term("duplicate", duplicate)
+
+    def _dates(
+        self,
+        key: str,
+        on: Optional[DateLike],
+        after: Optional[DateLike],
+        before: Optional[DateLike],
+    ) -> SearchQuery:
+        ret = self
+        if on is not None:
+            ret = ret.term(key, _format_date(on))
+        if after is not None:
+            ret = ret.term(key, ">" + _format_date(after))
+        if before is not None:
+            ret = ret.term(key, "<" + _format_date(before))
+        return ret
+
+    def created(
+        self,
+        on: Optional[DateLike] = None,
+        after: Optional[DateLike] = None,
+        before: Optional[DateLike] = None,
+    ) -> SearchQuery:
+        """Raindrops created on, after or before the date."""
+        return self._dates("created", on, after, before)
+
+    def lastUpdate(
+        self,
+        on: Optional[DateLike] = None,
+        after: Optional[DateLike] = None,
+        before: Optional[DateLike] = None,
+    ) -> SearchQuery:
+        """Raindrops updated on, after or before the date."""
+        return self._dates("lastUpdate", on, after, before)
+
+
+class CacheStatus(enum.Enum):
+    ready = "ready"
+    retry = "retry"
+    failed = "failed"
+    invalid_origin = "invalid-origin"
+    invalid_timeout = "invalid-timeout"
+    invalid_size = "invalid-size"
+
+
+class Cache(Model):
+    """Permanent copy of a :class:`Raindrop`."""
+
+    status = ItemAttr(CacheStatus)
+    size = ItemAttr[Optional[int]](default=None)
+    created = ItemAttr[Optional[datetime.datetime]](dateparse, default=None)
+
+
+class File(Model):
+    """File uploaded to a :class:`Raindrop`."""
+
+    name = ItemAttr[str]()
+    size = ItemAttr[int]()
+    type = ItemAttr[str]()
+
+
+class Highlight(Model):
+    """Highlighted text in a :class:`Raindrop`."""
+
+    id = ItemAttr[str](name="_id")
+    text = ItemAttr[str]()
+    color = ItemAttr[str](default="yellow")
+    note = ItemAttr[str](default="")
+    created = ItemAttr(dateparse)
+
+
+class Raindrop(Model):
     """Raindrop"""
 
+    #: The maximum number of raindrops the server returns per page.
+    MAX_PERPAGE = 50
+
     id = ItemAttr[int](name="_id")
     collection = ItemAttr(CollectionRef)
     cover = ItemAttr[str]()
@@ -210,18 +800,21 @@ class Raindrop(DictModel):
     title = ItemAttr[str]()
     type = ItemAttr(RaindropType)
     user = ItemAttr(UserRef)
+    broken = ItemAttr[bool](default=False)
+    cache = ItemAttr[Optional[Cache]](Cache, default=None)
+    file = ItemAttr[Optional[File]](File, default=None)
+    highlights = SequenceAttr(Highlight, default=())
+    important = ItemAttr[bool](default=False)
 
-    #    broken: bool
-    #    cache: Cache
     #    creatorRef: UserRef
-    #    file: File
-    #    important: bool
     #    html: str
 
     @classmethod
     def get(cls, api: API, id: int) -> Raindrop:
-        URL = f"https://api.raindrop.io/rest/v1/raindrop/{id}"
-        item = api.get(URL).json()["item"]
+        item = _prefetched(api, cls, id)
+        if item is None:
+            URL = f"https://api.raindrop.io/rest/v1/raindrop/{id}"
+            item = api.get(URL).json()["item"]
         return cls(item)
 
     @classmethod
@@ -242,6 +835,7 @@ class Raindrop(DictModel):
         html: Optional[str] = None,
         excerpt: Optional[str] = None,
         title: Optional[str] = None,
+        highlights: Optional[Sequence[Dict[str, Any]]] = None,
     ) -> Raindrop:
 
         args: Dict[str, Any] = {
@@ -276,9 +870,12 @@ class Raindrop(DictModel):
             args["excerpt"] = excerpt
         if title is not None:
             args["title"] = title
+        if highlights is not None:
+            args["highlights"] = highlights
 
         URL = "https://api.raindrop.io/rest/v1/raindrop"
         item = api.post(URL, json=args).json()["item"]
+        _stats_moved(api, None, _collection_id(item))
         return cls(item)
 
     @classmethod
@@ -300,7 +897,14 @@ class Raindrop(DictModel):
         excerpt: Optional[str] = None,
         title: Optional[str] = None,
         link: Optional[str] = None,
+        highlights: Optional[Sequence[Dict[str, Any]]] = None,
     ) -> Raindrop:
+        """Update the raindrop.
+
+        :param highlights: (optional) Highlights to add, update or remove.
+            An item with ``_id`` updates the highlight, and an item with
+            ``_id`` and empty ``text`` removes it.
+        """
 
         args: Dict[str, Any] = {}
         if pleaseParse:
@@ -334,15 +938,223 @@ class Raindrop(DictModel):
             args["title"] = title
         if link is not None:
             args["link"] = link
+        if highlights is not None:
+            args["highlights"] = highlights
 
         URL = f"https://api.raindrop.io/rest/v1/raindrop/{id}"
         item = api.put(URL, json=args).json()["item"]
+        _invalidate(api, cls, id)
+        if collection is not None:
+            # The source collection is unknown.
+            _stats_invalidate(api)
         return cls(item)
 
     @classmethod
     def remove(cls, api: API, id: int) -> None:
         URL = f"https://api.raindrop.io/rest/v1/raindrop/{id}"
         api.delete(URL, json={})
+        _invalidate(api, cls, id)
+        _stats_invalidate(api)
+
+    @classmethod
+    def upload_file(
+        cls,
+        api: API,
+        file: FileLike,
+        collection: Union[Collection, CollectionRef, int] = CollectionRef.Unsorted,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        progress: Optional[Progress] = None,
+    ) -> Raindrop:
+        """Create a raindrop from the file.
+
+        The file is streamed to the server without loading it to memory.
+        Uploads can be run concurrently from multiple threads.
+
+        :param file: A path to the file, or a binary file object.
+        :param progress: (optional) Called with bytes sent and the total size
+            of the request body.
+        """
+        if isinstance(collection, (Collection, CollectionRef)):
+            collection = collection.id
+
+        name, f, content_type, opened = open_file(file, filename, content_type)
+        try:
+            body = MultipartEncoder(
+                [("file", (name, f, content_type)), ("collectionId", str(collection))],
+                progress,
+            )
+            URL = "https://api.raindrop.io/rest/v1/raindrop/file"
+            item = api.put_multipart(URL, body).json()["item"]
+        finally:
+            if opened:
+                f.close()
+        _stats_moved(api, None, _collection_id(item))
+        return cls(item)
+
+    @classmethod
+    def upload_cover(
+        cls,
+        api: API,
+        id: int,
+        file: FileLike,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        progress: Optional[Progress] = None,
+    ) -> Raindrop:
+        """Upload the cover image of the raindrop.
+
+        :param file: A path to the file, or a binary file object.
+        :param progress: (optional) Called with bytes sent and the total size
+            of the request body.
+        """
+        name, f, content_type, opened = open_file(file, filename, content_type)
+        try:
+            body = MultipartEncoder([("cover", (name, f, content_type))], progress)
+            URL = f"https://api.raindrop.io/rest/v1/raindrop/{id}/cover"
+            item = api.put_multipart(URL, body).json()["item"]
+        finally:
+            if opened:
+                f.close()
+        _invalidate(api, cls, id)
+        return cls(item)
+
+    @classmethod
+    def download_cache(
+        cls,
+        api: API,
+        id: int,
+        path: str,
+        resume: bool = True,
+        expected_size: Optional[int] = None,
+        progress: Optional[Progress] = None,
+    ) -> int:
+        """Download the permanent copy of the raindrop to the file.
+
+        See :meth:`API.download` for the arguments.
+
+        :return: The size of the file.
+        """
+        URL = f"https://api.raindrop.io/rest/v1/raindrop/{id}/cache"
+        return api.download(
+            URL, path, resume=resume, expected_size=expected_size, progress=progress
+        )
+
+    @classmethod
+    def download_caches(
+        cls,
+        api: API,
+        targets: Iterable[Tuple[Union[Raindrop, int], str]],
+        max_workers: int = 4,
+        resume: bool = True,
+    ) -> Dict[int, Union[int, Exception]]:
+        """Download permanent copies of raindrops concurrently.
+
+        :param targets: Pairs of the raindrop and the path to write. If a
+            :class:`Raindrop` with ready :attr:`cache` is given, the size of
+            the file is verified.
+        :return: Dictionary of raindrop id to the size of the file, or the
+            exception raised.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def download(target: Tuple[Union[Raindrop, int], str]) -> int:
+            raindrop, path = target
+            expected_size = None
+            if isinstance(raindrop, Raindrop):
+                cache = raindrop.cache
+                if cache is not None and cache.status == CacheStatus.ready:
+                    expected_size = cache.size
+                raindrop = raindrop.id
+
+            api.wait_ratelimit()
+            return cls.download_cache(
+                api, raindrop, path, resume=resume, expected_size=expected_size
+            )
+
+        ret: Dict[int, Union[int, Exception]] = {}
+        targets = list(targets)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(copy_context().run, download, target)
+                for target in targets
+            ]
+            for (raindrop, _), future in zip(targets, futures):
+                id = raindrop.id if isinstance(raindrop, Raindrop) else raindrop
+                try:
+                    ret[id] = future.result()
+                except Exception as e:
+                    ret[id] = e
+        return ret
+
+    def save(self, api: API, check_conflict: bool = False) -> Raindrop:
+        """Send modified attributes to the server.
+
+        No request is sent if no attribute is modified.
+
+        :param check_conflict: If True, raise :class:`ConflictError` if
+            ``lastUpdate`` on the server differs from this object.
+        """
+        URL = f"https://api.raindrop.io/rest/v1/raindrop/{self.id}"
+        moved = "collection" in self._dirty
+        ret = self._save(api, URL, check_conflict)
+        if moved:
+            _stats_invalidate(api)
+        return ret
+
+    @classmethod
+    def update_many(
+        cls,
+        api: API,
+        ids: Sequence[int],
+        source: Union[Collection, CollectionRef, int] = CollectionRef.All,
+        important: Optional[bool] = None,
+        tags: Optional[Sequence[str]] = None,
+        media: Optional[Sequence[Dict[str, Any]]] = None,
+        cover: Optional[str] = None,
+        collection: Optional[Union[Collection, CollectionRef, int]] = None,
+    ) -> int:
+        """Update raindrops in the ``source`` collection with one request.
+
+        Unlike :meth:`update`, ``tags`` and ``media`` are appended to the
+        existing values. An empty sequence clears them.
+
+        :return: The number of modified raindrops.
+        """
+
+        args: Dict[str, Any] = {"ids": list(ids)}
+        if important is not None:
+            args["important"] = important
+        if tags is not None:
+            args["tags"] = tags
+        if media is not None:
+            args["media"] = media
+        if cover is not None:
+            args["cover"] = cover
+        if collection is not None:
+            if isinstance(collection, (Collection, CollectionRef)):
+                args["collection"] = {"$id": collection.id}
+            else:
+                args["collection"] = {"$id": collection}
+
+        if isinstance(source, (Collection, CollectionRef)):
+            source = source.id
+
+        URL = f"https://api.raindrop.io/rest/v1/raindrops/{source}"
+        ret = api.put(URL, json=args).json()
+        modified = int(ret.get("modified", 0))
+        if ids:
+            for id in ids:
+                _invalidate(api, cls, id)
+        else:
+            # All raindrops in the source collection are updated.
+            _invalidate(api, cls)
+        if collection is not None:
+            if source == CollectionRef.All.id:
+                _stats_invalidate(api)
+            else:
+                _stats_moved(api, source, args["collection"]["$id"], modified)
+        return modified
 
     @classmethod
     def search(
@@ -354,9 +1166,69 @@ class Raindrop(DictModel):
         word: Optional[str] = None,
         tag: Optional[str] = None,
         important: Optional[bool] = None,
+        fields: Optional[Sequence[str]] = None,
+        query: Optional[SearchQuery] = None,
+        sort: Optional[SortOrder] = None,
+        nested: Optional[bool] = None,
     ) -> List[Raindrop]:
+        """Search raindrops in the collection.
+
+        :param fields: (optional) Names of attributes to keep, e.g.
+            ``["id", "link", "lastUpdate", "tags"]``. Other items of the
+            response are discarded, and accessing them raises ValueError.
+
+        :param query: (optional) :class:`SearchQuery` evaluated by the server,
+            in addition to ``word``, ``tag`` and ``important``.
+
+        :param sort: (optional) :class:`SortOrder` of the results.
+
+        :param nested: (optional) If True, include raindrops in the nested
+            collections.
+        """
 
-        args: List[Dict[str, Any]] = []
+        URL, params = cls._search_request(
+            collection, page, perpage, word, tag, important, query, sort, nested
+        )
+        results = api.get(URL, params=params).json()
+        return [_project(cls, item, fields) for item in results["items"]]
+
+    @classmethod
+    def iter_search(
+        cls,
+        api: API,
+        collection: CollectionRef = CollectionRef.Unsorted,
+        page: int = 0,
+        perpage: int = 50,
+        word: Optional[str] = None,
+        tag: Optional[str] = None,
+        important: Optional[bool] = None,
+        fields: Optional[Sequence[str]] = None,
+        query: Optional[SearchQuery] = None,
+        sort: Optional[SortOrder] = None,
+        nested: Optional[bool] = None,
+    ) -> Iterator[Raindrop]:
+        """Same as :meth:`search`, but yields raindrops while the response
+        is downloaded. See :meth:`API.iter_items`."""
+
+        URL, params = cls._search_request(
+            collection, page, perpage, word, tag, important, query, sort, nested
+        )
+        for item in api.iter_items(URL, params=params):
+            yield _project(cls, item, fields)
+
+    @staticmethod
+    def _search_request(
+        collection: CollectionRef,
+        page: int,
+        perpage: int,
+        word: Optional[str],
+        tag: Optional[str],
+        important: Optional[bool],
+        query: Optional[SearchQuery],
+        sort: Optional[SortOrder],
+        nested: Optional[bool],
+    ) -> Tuple[str, Dict[str, Any]]:
+        args: List[Dict[str, Any]] = list(query.terms) if query else []
         if word is not None:
             args.append({"key": "word", "val": word})
         if tag is not None:
@@ -364,12 +1236,108 @@ class Raindrop(DictModel):
         if important is not None:
             args.append({"key": "important", "val": important})
 
-        params = {"search": json.dumps(args), "perpage": perpage, "page": page}
+        params: Dict[str, Any] = {
+            "search": json.dumps(args),
+            "perpage": perpage,
+            "page": page,
+        }
+        if sort is not None:
+            params["sort"] = sort.value
+        if nested is not None:
+            params["nested"] = "true" if nested else "false"
 
         URL = f"https://api.raindrop.io/rest/v1/raindrops/{collection.id}"
+        return URL, params
 
-        results = api.get(URL, params=params).json()
-        return [cls(item) for item in results["items"]]
+    @classmethod
+    def search_collections(
+        cls,
+        api: API,
+        collections: Iterable[Union[Collection, CollectionRef, int]],
+        sort: SortOrder = SortOrder.created_desc,
+        perpage: int = 50,
+        max_workers: int = 4,
+        query: Optional[SearchQuery] = None,
+        fields: Optional[Sequence[str]] = None,
+        nested: Optional[bool] = None,
+    ) -> Iterator[Raindrop]:
+        """Search raindrops in multiple collections concurrently.
+
+        Pages of each collection are fetched by up to ``max_workers`` threads,
+        waiting for :meth:`API.wait_ratelimit` before each request. Results
+        are merged in ``sort`` order as they arrive; a raindrop found in more
+        than one collection is yielded once.
+
+        :param sort: Sort order of the results. :attr:`SortOrder.score` and
+            :attr:`SortOrder.sort` are specific to a collection and cannot be
+            merged.
+        :param perpage: Raindrops per request, up to :attr:`MAX_PERPAGE`.
+        """
+        import heapq
+        from concurrent.futures import Future, ThreadPoolExecutor
+
+        # A short page ends the collection, so a page size the server does not
+        # return would stop after the first page.
+        perpage = min(perpage, cls.MAX_PERPAGE)
+
+        if sort not in _MERGE_KEYS:
+            raise ValueError(f"Can not merge results sorted by {sort.value}")
+        key, load = _MERGE_KEYS[sort]
+        if fields is not None:
+            # The sort key is needed to merge, and the id to deduplicate.
+            fields = [*fields, *(f for f in ("id", key) if f not in fields)]
+
+        refs = []
+        for c in collections:
+            if isinstance(c, int):
+                c = CollectionRef(c)
+            elif isinstance(c, Collection):
+                c = CollectionRef(c.id)
+            refs.append(c)
+
+        def fetch(ref: CollectionRef, page: int) -> List[Raindrop]:
+            api.wait_ratelimit()
+            return cls.search(
+                api,
+                collection=ref,
+                page=page,
+                perpage=perpage,
+                query=query,
+                sort=sort,
+                nested=nested,
+                fields=fields,
+            )
+
+        def pages(
+            ref: CollectionRef, future: Future[List[Raindrop]]
+        ) -> Iterator[Raindrop]:
+            page = 0
+            while True:
+                items = future.result()
+                if len(items) < perpage:
+                    yield from items
+                    return
+                page += 1
+                future = executor.submit(copy_context().run, fetch, ref, page)
+                yield from items
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Request the first pages of all collections before merging.
+            iters = [
+                pages(ref, executor.submit(copy_context().run, fetch, ref, 0))
+                for ref in refs
+            ]
+            merged = heapq.merge(
+                *iters,
+                key=lambda r: load(r.values[key]),
+                reverse=sort.value.startswith("-"),
+            )
+
+            seen = set()
+            for raindrop in merged:
+                if raindrop.id not in seen:
+                    seen.add(raindrop.id)
+                    yield raindrop
 
 
 class BrokenLevel(enum.Enum):
@@ -384,7 +1352,7 @@ class FontColor(enum.Enum):
     night = "night"
 
 
-class UserConfig(DictModel):
+class UserConfig(Model):
     broken_level = ItemAttr(BrokenLevel)
     font_color = ItemAttr[Optional[FontColor]](FontColor, default=None)
     font_size = ItemAttr[int]()
@@ -392,20 +1360,71 @@ class UserConfig(DictModel):
     raindrops_view = ItemAttr(View)
 
 
-class Group(DictModel):
+class Group(Model):
     title = ItemAttr[str]()
     hidden = ItemAttr[bool]()
     sort = ItemAttr[int]()
     collectionids = SequenceAttr[int](name="collections")
 
 
-class UserFiles(DictModel):
+class UserFiles(Model):
     used = ItemAttr[int]()
     size = ItemAttr[int]()
     lastCheckPoint = ItemAttr(dateparse)
 
 
-class User(DictModel):
+class Stats(Model):
+    """Aggregate counts of the user's raindrops."""
+
+    items = ItemAttr[Sequence[Dict[str, Any]]]()
+    meta = ItemAttr[Dict[str, Any]](default={})
+
+    @classmethod
+    def get(cls, api: API) -> Stats:
+        """Get the counts. Returns a copy of the cached object if
+        :class:`~raindropio.stats.StatsCache` is installed to ``api``."""
+        if api.stats_cache is not None:
+            return api.stats_cache.get()
+        return cls._fetch(api)
+
+    @classmethod
+    def _fetch(cls, api: API) -> Stats:
+        URL = "https://api.raindrop.io/rest/v1/user/stats"
+        ret = api.get(URL).json()
+        return cls({"items": ret["items"], "meta": ret.get("meta", {})})
+
+    def count(self, collection: Union[Collection, CollectionRef, int]) -> int:
+        """The number of raindrops in :attr:`CollectionRef.All`,
+        :attr:`CollectionRef.Unsorted` or :attr:`CollectionRef.Trash`."""
+        if isinstance(collection, (Collection, CollectionRef)):
+            collection = collection.id
+        for item in self.items:
+            if item["_id"] == collection:
+                return int(item["count"])
+        return 0
+
+    @property
+    def all(self) -> int:
+        return self.count(CollectionRef.All)
+
+    @property
+    def unsorted(self) -> int:
+        return self.count(CollectionRef.Unsorted)
+
+    @property
+    def trash(self) -> int:
+        return self.count(CollectionRef.Trash)
+
+    @property
+    def duplicates(self) -> int:
+        return int(self.meta.get("duplicates", {}).get("count", 0))
+
+    @property
+    def broken(self) -> int:
+        return int(self.meta.get("broken", {}).get("count", 0))
+
+
+class User(Model):
     """User"""
 
     id = ItemAttr[int](name="_id")
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import io
+import os
+from typing import IO, Callable, Iterator, List, Optional, Tuple, Union
+
+__all__ = ["FileLike", "MultipartEncoder", "Progress", "open_file"]
+
+#: A path to the file, or a binary file object.
+FileLike = Union[str, "os.PathLike[str]", IO[bytes]]
+
+#: Called with bytes sent and the total size (``None`` if unknown).
+Progress = Callable[[int, Optional[int]], None]
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _quote(s: str) -> str:
+    return s.replace("\\", "\\\\").replace('"', '\\"')
+
+
+class MultipartEncoder:
+    """Streams ``multipart/form-data`` body without loading files to memory.
+
+    :param fields: List of ``(name, value)`` tuples. ``value`` is a string,
+        or a tuple of ``(filename, file object, content type)``.
+    :param progress: (optional) Called as data is read.
+
+    The object is passed as request body. ``len`` is the size of the body,
+    or ``None`` if a file is not seekable.
+    """
+
+    def __init__(
+        self,
+        fields: List[Tuple[str, Union[str, Tuple[str, IO[bytes], str]]]],
+        progress: Optional[Progress] = None,
+    ) -> None:
+        self.boundary = os.urandom(16).hex()
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.progress = progress
+
+        self._parts: List[Union[bytes, IO[bytes]]] = []
+        size: Optional[int] = 0
+        for name, value in fields:
+            if isinstance(value, str):
+                header = (
+                    f"--{self.boundary}\r\n"
+                    f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+                )
+                self._parts.append(header.encode() + value.encode() + b"\r\n")
+            else:
+                filename, f, content_type = value
+                header = (
+                    f"--{self.boundary}\r\n"
+                    f'Content-Disposition: form-data; name="{_quote(name)}"; '
+                    f'filename="{_quote(filename)}"\r\n'
+                    f"Content-Type: {content_type}\r\n\r\n"
+                )
+                self._parts += [header.encode(), f, b"\r\n"]
+
+        self._parts.append(f"--{self.boundary}--\r\n".encode())
+
+        for part in self._parts:
+            if isinstance(part, bytes):
+                length: Optional[int] = len(part)
+            else:
+                length = _remaining(part)
+            size = None if size is None or length is None else size + length
+
+        #: Size of the body. Read by :mod:`requests` to set Content-Length.
+        self.len = size
+        self.sent = 0
+        self._chunks = self._iter_chunks()
+        self._buf = b""
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                while True:
+                    chunk = part.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def _sent(self, data: bytes) -> bytes:
+        self.sent += len(data)
+        if self.progress is not None and data:
+            self.progress(self.sent, self.len)
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return self._sent(self._buf + b"".join(self._chunks))
+
+        while len(self._buf) < size:
+            chunk = next(self._chunks, b"")
+            if not chunk:
+                break
+            self._buf += chunk
+
+        ret, self._buf = self._buf[:size], self._buf[size:]
+        return self._sent(ret)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _remaining(f: IO[bytes]) -> Optional[int]:
+    try:
+        if not f.seekable():
+            return None
+        pos = f.tell()
+        end = f.seek(0, io.SEEK_END)
+        f.seek(pos)
+    except (AttributeError, OSError):
+        return None
+    return end - pos
+
+
+def open_file(
+    file: FileLike, filename: Optional[str], content_type: Optional[str]
+) -> Tuple[str, IO[bytes], str, bool]:
+    """Returns file name, file object, content type, and True if the file was
+    opened and should be closed by the caller."""
+
+    import mimetypes
+
+    if isinstance(file, (str, os.PathLike)):
+        f: IO[bytes] = open(file, "rb")
+        opened = True
+        name = filename or os.path.basename(os.fspath(file))
+    else:
+        f = file
+        opened = False
+        path = getattr(file, "name", None)
+        if not isinstance(path, str):
+            path = "file"
+        name = filename or os.path.basename(path)
+
+    if content_type is None:
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    return name, f, content_type, opened
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from contextvars import copy_context
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple, Type, Union
+
+from .api import API
+from .models import Collection, Raindrop
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+__all__ = ["Prefetcher"]
+
+_Model = Union[Type[Collection], Type[Raindrop]]
+
+
+class Prefetcher:
+    """Fetches collections and raindrops in background threads.
+
+    :param api: The :class:`API` object used to send requests.
+    :param max_workers: The number of threads to send requests.
+    :param ttl: Seconds to keep fetched objects. ``None`` to keep them until
+        they are updated or removed through this library.
+
+    While the prefetcher is installed to ``api``, :meth:`Collection.get` and
+    :meth:`Raindrop.get` return the fetched objects without sending
+    requests, or wait for the request already in progress::
+
+        prefetcher = Prefetcher(api)
+        prefetcher.collections(group.collectionids)
+        ...
+        collection = Collection.get(api, group.collectionids[0])
+    """
+
+    def __init__(
+        self, api: API, max_workers: int = 4, ttl: Optional[float] = 60
+    ) -> None:
+        self.api = api
+        self.max_workers = max_workers
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._items: Dict[Tuple[_Model, int], Tuple[float, Dict[str, Any]]] = {}
+        self._futures: Dict[Tuple[_Model, int], Future[None]] = {}
+        # Incremented by invalidate() for each item and invalidate_all() for
+        # each model, so a fetch in progress does not store values read
+        # before the invalidation.
+        self._generations: Dict[Any, int] = {}
+
+        api.prefetcher = self
+
+    def __enter__(self) -> Prefetcher:
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:  # type: ignore
+        self.close()
+
+    def close(self) -> None:
+        """Uninstall from the :class:`API` and stop the threads."""
+
+        if self.api.prefetcher is self:
+            self.api.prefetcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def collections(self, ids: Iterable[int]) -> None:
+        """Start fetching collections which are not fetched yet."""
+        self._prefetch(Collection, ids)
+
+    def raindrops(self, ids: Iterable[int]) -> None:
+        """Start fetching raindrops which are not fetched yet."""
+        self._prefetch(Raindrop, ids)
+
+    def _prefetch(self, model: _Model, ids: Iterable[int]) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers)
+
+            now = time.monotonic()
+            for id in ids:
+                key = (model, id)
+                if key in self._futures or self._fresh(key, now):
+                    continue
+                self._futures[key] = self._executor.submit(
+                    copy_context().run, self._fetch, model, id
+                )
+
+    def _fresh(self, key: Tuple[_Model, int], now: float) -> bool:
+        entry = self._items.get(key)
+        if entry is None:
+            return False
+        return self.ttl is None or now - entry[0] < self.ttl
+
+    def _generation(self, key: Tuple[_Model, int]) -> Tuple[int, int]:
+        return self._generations.get(key, 0), self._generations.get(key[0], 0)
+
+    def _fetch(self, model: _Model, id: int) -> None:
+        key = (model, id)
+        self._local.fetching = True
+        try:
+            with self._lock:
+                generation = self._generation(key)
+            values = model.get(self.api, id).values
+            with self._lock:
+                if self._generation(key) == generation:
+                    self._items[key] = (time.monotonic(), values)
+        finally:
+            self._local.fetching = False
+            with self._lock:
+                del self._futures[key]
+
+    def lookup(self, model: _Model, id: int) -> Optional[Dict[str, Any]]:
+        """Return a copy of the fetched item, waiting for the request in
+        progress. ``None`` if the item is not prefetched or it failed."""
+
+        if getattr(self._local, "fetching", False):
+            return None
+
+        key = (model, id)
+        with self._lock:
+            future = self._futures.get(key)
+
+        if future is not None and future.exception() is not None:
+            return None
+
+        with self._lock:
+            if not self._fresh(key, time.monotonic()):
+                return None
+            return copy.deepcopy(self._items[key][1])
+
+    def invalidate(self, model: _Model, id: int) -> None:
+        """Discard the fetched item."""
+
+        key = (model, id)
+        with self._lock:
+            self._items.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def invalidate_all(self, model: _Model) -> None:
+        """Discard all fetched items of the model."""
+
+        with self._lock:
+            for key in [key for key in self._items if key[0] is model]:
+                del self._items[key]
+            self._generations[model] = self._generations.get(model, 0) + 1
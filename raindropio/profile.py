@@ -0,0 +1,313 @@
+"""Per-phase timings of requests and model access.
+
+::
+
+    with api.profile() as profile:
+        for raindrop in Raindrop.search(api):
+            print(raindrop.title, raindrop.created)
+
+    profile.report()
+
+Network phases are recorded for each request:
+
+``connect``
+    Opening the connection and TLS handshake. Recorded by
+    :class:`~raindropio.transport.HTTPXTransport` only; other transports
+    include it in ``wait``.
+``wait``
+    Sending the request until the response headers are received.
+``download``
+    Reading the response body.
+``decode``
+    Parsing the JSON body with ``.json()``.
+
+Time spent constructing :class:`~raindropio.models.Model` objects and
+converting their attributes, such as parsing dates, is recorded per class
+and attribute.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from jashin.dictattr import ItemAttrBase
+
+from .models import Model
+
+if TYPE_CHECKING:
+    from .api import API
+    from .transport import Response, Transport
+
+__all__ = ["Profile", "RequestTiming"]
+
+#: Network phases recorded for each request.
+PHASES = ("connect", "wait", "download", "decode")
+
+_TRACE_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.start_tls": "connect",
+}
+
+_active: Optional[Profile] = None
+_active_lock = threading.Lock()
+
+
+class RequestTiming:
+    """Timings of a request in seconds, keyed by phase name."""
+
+    def __init__(self, method: str, url: str) -> None:
+        self.method = method
+        self.url = url
+        self.status: Optional[int] = None
+        self.timings: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "url": self.url,
+            "status": self.status,
+            **self.timings,
+        }
+
+
+class _Stat:
+    __slots__ = ("count", "total")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "total": self.total}
+
+
+def _model_classes() -> Iterator[type]:
+    todo: List[type] = [Model]
+    while todo:
+        cls = todo.pop()
+        yield cls
+        todo.extend(cls.__subclasses__())
+
+
+class Profile:
+    """Records timings while used as a context manager.
+
+    Created by :meth:`API.profile`. Requests are recorded for the
+    :class:`~raindropio.api.API` object only, but model timings are recorded
+    for all models accessed in any thread, so only one profile can be
+    active at a time.
+    """
+
+    def __init__(self, api: API) -> None:
+        self.api = api
+        #: (list of :class:`RequestTiming`) Requests sent while active.
+        self.requests: List[RequestTiming] = []
+        self.models: Dict[str, _Stat] = {}
+        self.attributes: Dict[str, _Stat] = {}
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._restore: List[Callable[[], None]] = []
+
+    def __enter__(self) -> Profile:
+        global _active
+
+        with _active_lock:
+            if _active is not None:
+                raise RuntimeError("Another profile is active")
+            _active = self
+        self._install()
+        self.api._profile = self
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:  # type: ignore
+        global _active
+
+        self.api._profile = None
+        for restore in reversed(self._restore):
+            restore()
+        self._restore.clear()
+        with _active_lock:
+            _active = None
+
+    def _add(self, stats: Dict[str, _Stat], key: str, elapsed: float) -> None:
+        with self._lock:
+            stat = stats.get(key)
+            if stat is None:
+                stat = stats[key] = _Stat()
+            stat.count += 1
+            stat.total += elapsed
+
+    def _install(self) -> None:
+        # Wrap Model.__init__ and attribute loaders while the profile is
+        # active, so that disabled profiling costs nothing.
+        init = Model.__init__
+
+        def timed_init(model: Model, values: Dict[str, Any]) -> None:
+            start = time.perf_counter()
+            try:
+                init(model, values)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._add(self.models, type(model).__name__, elapsed)
+
+        if "__init__" in vars(Model):
+            self._restore.append(lambda: setattr(Model, "__init__", init))
+        else:
+            self._restore.append(lambda: delattr(Model, "__init__"))
+        setattr(Model, "__init__", timed_init)
+
+        for cls in _model_classes():
+            for name, attr in vars(cls).items():
+                if isinstance(attr, ItemAttrBase) and attr.funcs[0] is not None:
+                    self._wrap_loader(attr, f"{cls.__name__}.{name}")
+
+    def _wrap_loader(self, attr: ItemAttrBase[Any], key: str) -> None:
+        funcs = attr.funcs
+        load = funcs[0]
+        assert load is not None
+
+        def timed_load(value: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return load(value)
+            finally:
+                self._add(self.attributes, key, time.perf_counter() - start)
+
+        attr.funcs = (timed_load, funcs[1])
+        self._restore.append(lambda: setattr(attr, "funcs", funcs))
+
+    def trace(self, event: str, info: Dict[str, Any]) -> None:
+        """Receives the ``trace`` extension events of :mod:`httpx`."""
+
+        name, _, state = event.rpartition(".")
+        phase = _TRACE_PHASES.get(name)
+        timing = getattr(self._local, "timing", None)
+        if phase is None or timing is None:
+            return
+
+        if state == "started":
+            self._local.started = time.perf_counter()
+        elif state in ("complete", "failed"):
+            elapsed = time.perf_counter() - self._local.started
+            timing.timings[phase] += elapsed
+
+    def request(
+        self,
+        transport: Transport,
+        method: str,
+        url: str,
+        stream: bool,
+        **kwargs: Any,
+    ) -> Response:
+        """Send a request with ``transport`` and record its timings."""
+
+        timing = RequestTiming(method, url)
+        with self._lock:
+            self.requests.append(timing)
+
+        self._local.timing = timing
+        try:
+            start = time.perf_counter()
+            resp = transport.request(method, url, stream=True, **kwargs)
+            headers = time.perf_counter()
+        finally:
+            self._local.timing = None
+
+        timing.status = resp.status_code
+        timing.timings["wait"] = headers - start - timing.timings["connect"]
+
+        if not stream:
+            read = getattr(resp, "read", None)
+            if read is not None:
+                read()  # httpx
+            else:
+                resp.content
+            timing.timings["download"] = time.perf_counter() - headers
+
+        json = resp.json
+
+        def timed_json(**kw: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return json(**kw)
+            finally:
+                timing.timings["decode"] += time.perf_counter() - start
+
+        resp.json = timed_json  # type: ignore[method-assign]
+        return resp
+
+    def _phase_stats(self) -> Dict[str, _Stat]:
+        ret = {phase: _Stat() for phase in PHASES}
+        with self._lock:
+            requests = list(self.requests)
+        for timing in requests:
+            for phase, elapsed in timing.timings.items():
+                ret[phase].count += 1
+                ret[phase].total += elapsed
+        return ret
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the timings as a dictionary which can be dumped to JSON."""
+
+        with self._lock:
+            requests = [timing.as_dict() for timing in self.requests]
+            models = {k: v.as_dict() for k, v in self.models.items()}
+            attributes = {k: v.as_dict() for k, v in self.attributes.items()}
+
+        return {
+            "requests": requests,
+            "phases": {k: v.as_dict() for k, v in self._phase_stats().items()},
+            "models": models,
+            "attributes": attributes,
+        }
+
+    def report(self, file: Optional[IO[str]] = None) -> None:
+        """Print the timings aggregated by phase, model and attribute."""
+
+        if file is None:
+            file = sys.stdout
+
+        with self._lock:
+            models = sorted(self.models.items(), key=_by_total)
+            attributes = sorted(self.attributes.items(), key=_by_total)
+
+        sections = [
+            ("phase", list(self._phase_stats().items())),
+            ("model", models),
+            ("attribute", attributes),
+        ]
+        width = max(
+            [len(name) for _, rows in sections for name, _ in rows] + [len("attribute")]
+        )
+        for title, rows in sections:
+            if not rows:
+                continue
+            print(
+                f"{title:<{width}} {'count':>8} {'total(s)':>10} {'mean(ms)':>10}",
+                file=file,
+            )
+            for name, stat in rows:
+                mean = stat.total / stat.count * 1000 if stat.count else 0.0
+                print(
+                    f"{name:<{width}} {stat.count:>8} {stat.total:>10.3f} {mean:>10.3f}",
+                    file=file,
+                )
+            print(file=file)
+
+
+def _by_total(item: Tuple[str, _Stat]) -> float:
+    return -item[1].total
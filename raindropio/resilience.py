@@ -0,0 +1,326 @@
+"""Deadlines and circuit breaker for requests.
+
+::
+
+    api = API(token, timeout=10, breaker=CircuitBreaker(stale=True))
+
+    with api.deadline(30):
+        collections = Collection.get_roots(api)
+        if api.stale:
+            ...  # served from the last successful response
+
+Once ``threshold`` consecutive requests to an endpoint fail with a
+connection error, a timeout, ``429`` or a ``5xx`` status, the circuit of
+the endpoint is open and requests fail with :class:`CircuitOpenError`
+without being sent. After ``reset_timeout`` seconds a single request is
+sent to probe the endpoint, and the circuit is closed if it succeeds.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar, copy_context
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .transport import Response
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "DeadlineExceeded",
+    "deadline",
+    "remaining",
+]
+
+_deadline: ContextVar[Optional[float]] = ContextVar("raindropio_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised if a request is sent after the deadline."""
+
+
+class CircuitOpenError(Exception):
+    """Raised if the circuit of the endpoint is open."""
+
+
+@contextlib.contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Requests in the block must complete within ``seconds``.
+
+    The timeout of each request is shortened to the time remaining. Nested
+    deadlines can not extend the enclosing deadline.
+    """
+
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        at = min(at, current)
+
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(timeout: Optional[float]) -> Optional[float]:
+    """Return ``timeout`` shortened to the current deadline.
+
+    :raises DeadlineExceeded: if the deadline has passed.
+    """
+
+    at = _deadline.get()
+    if at is None:
+        return timeout
+
+    left = at - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    return left if timeout is None else min(timeout, left)
+
+
+_ID = re.compile(r"/-?\d+(?=/|$)")
+
+
+def endpoint(method: str, url: str) -> Tuple[str, str]:
+    """Return the circuit key of the request. Ids in the path are replaced
+    with ``{id}``, and the query is ignored."""
+
+    from urllib.parse import urlsplit
+
+    path = urlsplit(url).path
+    return method, _ID.sub("/{id}", path)
+
+
+def _is_failure(e: BaseException) -> bool:
+    resp = getattr(e, "response", None)
+    status = getattr(resp, "status_code", None)
+    if status is None:
+        # Connection errors and timeouts. Exceeding the caller's deadline is
+        # not a failure of the endpoint.
+        return isinstance(e, Exception) and not isinstance(
+            e, (CircuitOpenError, DeadlineExceeded)
+        )
+    return bool(status >= 500 or status == 429)
+
+
+# (access token, url, params)
+_CacheKey = Tuple[str, str, str]
+
+
+class _Circuit:
+    def __init__(self) -> None:
+        self.failures = 0
+        self.opened: Optional[float] = None
+        self.probing = False
+
+
+class CircuitBreaker:
+    """Fails fast on endpoints which keep failing.
+
+    :param threshold: Number of consecutive failures to open the circuit.
+    :param reset_timeout: Seconds to wait before probing an open circuit.
+    :param stale: If True, keep the last successful response of each GET
+        request, and return it instead of failing while the circuit is open
+        or the request failed. While stale responses are served, the probe
+        request is sent in a background thread.
+    :param max_stale: (optional) Seconds to keep the responses.
+    :param max_responses: Maximum number of responses kept. The least
+        recently used responses are discarded first.
+
+    Responses are kept per access token, so a breaker can be shared by
+    :class:`~raindropio.api.API` objects of different users.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        reset_timeout: float = 30.0,
+        stale: bool = False,
+        max_stale: Optional[float] = None,
+        max_responses: int = 1024,
+    ) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.stale = stale
+        self.max_stale = max_stale
+        self.max_responses = max_responses
+
+        self._lock = threading.Lock()
+        self._circuits: Dict[Tuple[str, str], _Circuit] = {}
+        self._responses: OrderedDict[_CacheKey, Tuple[float, Response]] = OrderedDict()
+        self._revalidating: Set[_CacheKey] = set()
+
+    def state(self, method: str, url: str) -> str:
+        """Return ``"closed"``, ``"open"`` or ``"half-open"``."""
+
+        with self._lock:
+            circuit = self._circuits.get(endpoint(method, url))
+            if circuit is None or circuit.opened is None:
+                return "closed"
+            if time.monotonic() - circuit.opened >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def _allow(self, circuit: _Circuit) -> bool:
+        """Return True if a request can be sent. Called with the lock."""
+
+        if circuit.opened is None:
+            return True
+        if circuit.probing:
+            return False
+        if time.monotonic() - circuit.opened < self.reset_timeout:
+            return False
+        circuit.probing = True
+        return True
+
+    def _result(self, circuit: _Circuit, failed: bool) -> None:
+        with self._lock:
+            circuit.probing = False
+            if not failed:
+                circuit.failures = 0
+                circuit.opened = None
+                return
+
+            circuit.failures += 1
+            if circuit.failures >= self.threshold:
+                circuit.opened = time.monotonic()
+
+    def _expired(self, saved: float, now: float) -> bool:
+        return self.max_stale is not None and now - saved > self.max_stale
+
+    def _cached(self, key: _CacheKey) -> Optional[Response]:
+        """Return a copy of the kept response. Called with the lock."""
+
+        entry = self._responses.get(key)
+        if entry is None:
+            return None
+        saved, resp = entry
+        if self._expired(saved, time.monotonic()):
+            del self._responses[key]
+            return None
+
+        self._responses.move_to_end(key)
+        ret = copy.copy(resp)
+        ret.stale = True  # type: ignore[union-attr]
+        return ret
+
+    def _keep(self, key: _CacheKey, resp: Response) -> None:
+        """Keep the response, discarding expired and least recently used
+        ones. Called with the lock."""
+
+        now = time.monotonic()
+        self._responses[key] = (now, resp)
+        self._responses.move_to_end(key)
+
+        if self.max_stale is not None:
+            expired = [
+                k
+                for k, (saved, _) in self._responses.items()
+                if self._expired(saved, now)
+            ]
+            for k in expired:
+                del self._responses[k]
+
+        while len(self._responses) > self.max_responses:
+            self._responses.popitem(last=False)
+
+    def _send(
+        self,
+        circuit: _Circuit,
+        cache_key: Optional[_CacheKey],
+        send: Callable[[], Response],
+    ) -> Response:
+        try:
+            resp = send()
+        except (CircuitOpenError, DeadlineExceeded):
+            # Nothing was learned about the endpoint.
+            with self._lock:
+                circuit.probing = False
+            raise
+        except BaseException as e:
+            self._result(circuit, _is_failure(e))
+            raise
+
+        self._result(circuit, False)
+        if cache_key is not None:
+            with self._lock:
+                self._keep(cache_key, resp)
+        return resp
+
+    def _revalidate(
+        self,
+        circuit: _Circuit,
+        cache_key: _CacheKey,
+        send: Callable[[], Response],
+    ) -> None:
+        def run() -> None:
+            try:
+                self._send(circuit, cache_key, send)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._revalidating.discard(cache_key)
+
+        with self._lock:
+            if cache_key in self._revalidating:
+                circuit.probing = False
+                return
+            self._revalidating.add(cache_key)
+
+        # Run in a copy of the context, so that lane() applies to the probe.
+        ctx = copy_context()
+        threading.Thread(target=ctx.run, args=(run,), daemon=True).start()
+
+    def call(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[Any, Any]],
+        send: Callable[[], Response],
+        cacheable: bool = True,
+        token: str = "",
+    ) -> Response:
+        """Send the request with ``send`` unless the circuit is open.
+
+        :param cacheable: If False, the response is not kept for ``stale``.
+        :param token: The access token of the request. Kept responses are
+            returned only to requests with the same token.
+        """
+
+        key = endpoint(method, url)
+        cache_key = None
+        if self.stale and cacheable and method == "GET":
+            params_key = json.dumps(params, sort_keys=True, default=str)
+            cache_key = (token, url, params_key)
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                circuit = self._circuits[key] = _Circuit()
+            allowed = self._allow(circuit)
+            cached = self._cached(cache_key) if cache_key else None
+
+        if cached is not None and circuit.opened is not None:
+            assert cache_key
+            if allowed:
+                self._revalidate(circuit, cache_key, send)
+            return cached
+
+        if not allowed:
+            raise CircuitOpenError(f"Circuit of {key[0]} {key[1]} is open")
+
+        try:
+            return self._send(circuit, cache_key, send)
+        except Exception as e:
+            if cached is not None and _is_failure(e):
+                return cached
+            raise
@@ -0,0 +1,246 @@
+"""Priority lanes for requests sharing a rate limit.
+
+A :class:`Scheduler` shared by :class:`~raindropio.api.API` objects decides
+which request is sent next. Requests in a higher priority lane are sent
+before waiting requests of lower priority lanes, and lower priority lanes
+can not use the concurrency slots and rate limit budget reserved for higher
+priority lanes::
+
+    scheduler = Scheduler(max_concurrency=8)
+
+    api = API(token, scheduler=scheduler)
+    with lane("batch"):
+        Raindrop.update_many(api, ids, collection=10)
+
+Requests are sent in the ``interactive`` lane unless :func:`lane` selects
+another one. The lane is stored in a :mod:`contextvars` variable. It applies
+to :meth:`~raindropio.api.API.aget` and to the threads of this library such
+as :meth:`~raindropio.models.Raindrop.search_collections`, but threads
+started in the block should be run with :func:`contextvars.copy_context`.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Optional
+
+from .resilience import remaining
+
+if TYPE_CHECKING:
+    from .api import API
+
+__all__ = ["Lane", "Scheduler", "lane"]
+
+_lane: ContextVar[Optional[str]] = ContextVar("raindropio_lane", default=None)
+
+
+@contextlib.contextmanager
+def lane(name: str) -> Iterator[None]:
+    """Send requests in the block through the lane ``name``."""
+
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class Lane:
+    """A priority class of requests.
+
+    :param priority: Lanes with smaller numbers are served first.
+    :param max_concurrency: (optional) Maximum number of requests of this
+        lane in progress.
+    :param reserve: Fraction of the concurrency slots and of the rate limit
+        that lower priority lanes can not use.
+    """
+
+    #: Number of wait times kept to compute percentiles.
+    HISTORY = 1000
+
+    def __init__(
+        self,
+        priority: int,
+        max_concurrency: Optional[int] = None,
+        reserve: float = 0.0,
+    ) -> None:
+        if not 0.0 <= reserve <= 1.0:
+            raise ValueError("reserve must be between 0 and 1")
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+
+        self.active = 0
+        self.queued = 0
+        self.requests = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits: Deque[float] = collections.deque(maxlen=self.HISTORY)
+
+    def _full(self) -> bool:
+        return self.max_concurrency is not None and self.active >= self.max_concurrency
+
+    def _record(self, wait: float) -> None:
+        self.requests += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self._waits.append(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(len(waits) * p))]
+
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "requests": self.requests,
+            "wait_total": self.wait_total,
+            "wait_max": self.wait_max,
+            "wait_p50": percentile(0.5),
+            "wait_p95": percentile(0.95),
+        }
+
+
+def _default_lanes() -> Dict[str, Lane]:
+    return {
+        "interactive": Lane(0, reserve=0.25),
+        "batch": Lane(1),
+    }
+
+
+class Scheduler:
+    """Dispatches requests of :class:`~raindropio.api.API` objects sharing
+    an access token in priority order.
+
+    :param max_concurrency: Maximum number of requests in progress.
+    :param lanes: (optional) Dictionary of lane names to :class:`Lane`.
+        Defaults to ``interactive``, which reserves a quarter of the
+        capacity, and ``batch``.
+    :param default: The lane of requests sent outside of :func:`lane`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        lanes: Optional[Dict[str, Lane]] = None,
+        default: str = "interactive",
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.lanes = lanes if lanes is not None else _default_lanes()
+        if default not in self.lanes:
+            raise ValueError(f"Unknown lane: {default}")
+        self.default = default
+
+        self._cond = threading.Condition()
+        self._active = 0
+
+        # Rate limit reported by the last response.
+        self._ratelimit: Optional[int] = None
+        self._remaining: Optional[int] = None
+        self._reset: Optional[int] = None
+
+    def _higher(self, current: Lane) -> List[Lane]:
+        return [
+            other for other in self.lanes.values() if other.priority < current.priority
+        ]
+
+    def _delay(self, current: Lane) -> Optional[float]:
+        """Return 0 if a request of ``current`` can be sent now, seconds
+        until the rate limit is reset, or None to wait for a request to
+        complete."""
+
+        if current._full() or self._active >= self.max_concurrency:
+            return None
+
+        higher = self._higher(current)
+        for other in higher:
+            if other.queued and not other._full():
+                return None
+
+        reserved = sum(
+            max(0, round(other.reserve * self.max_concurrency) - other.active)
+            for other in higher
+        )
+        if self._active + reserved >= self.max_concurrency:
+            return None
+
+        if self._remaining is None or self._ratelimit is None:
+            return 0.0
+
+        # Requests in progress will consume the budget too.
+        budget = self._remaining - self._active
+        reserve = sum(other.reserve for other in higher) * self._ratelimit
+        if budget > reserve:
+            return 0.0
+
+        if self._reset is None:
+            return 0.0
+        delay = self._reset - time.time()
+        if delay <= 0:
+            self._remaining = None
+            return 0.0
+        return delay
+
+    def acquire(self, name: Optional[str] = None) -> str:
+        """Wait until a request of the lane can be sent. Returns the lane
+        name to pass to :meth:`release`.
+
+        :raises ~raindropio.resilience.DeadlineExceeded: if the deadline of
+            :func:`~raindropio.resilience.deadline` passes while waiting.
+        """
+
+        name = name or _lane.get() or self.default
+        current = self.lanes.get(name)
+        if current is None:
+            raise ValueError(f"Unknown lane: {name}")
+
+        start = time.monotonic()
+        with self._cond:
+            current.queued += 1
+            try:
+                while True:
+                    delay = self._delay(current)
+                    if delay == 0:
+                        break
+                    # Raises DeadlineExceeded if the deadline has passed.
+                    left = remaining(None)
+                    if left is not None:
+                        delay = left if delay is None else min(delay, left)
+                    self._cond.wait(delay)
+            finally:
+                current.queued -= 1
+
+            current.active += 1
+            self._active += 1
+            current._record(time.monotonic() - start)
+            # Lower priority lanes may be able to run now.
+            self._cond.notify_all()
+        return name
+
+    def release(self, name: str, api: Optional[API] = None) -> None:
+        """Mark the request complete, and update the rate limit from
+        ``api``."""
+
+        with self._cond:
+            self.lanes[name].active -= 1
+            self._active -= 1
+            if api is not None and api.ratelimit_remaining is not None:
+                self._ratelimit = api.ratelimit
+                self._remaining = api.ratelimit_remaining
+                self._reset = api.ratelimit_reset
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the numbers of requests and queue wait times in seconds
+        of each lane."""
+
+        with self._cond:
+            return {name: lane.stats() for name, lane in self.lanes.items()}
@@ -0,0 +1,286 @@
+"""Binary snapshot of collections and raindrops.
+
+A snapshot file is read with :mod:`mmap`. Ids, parent/collection ids and
+timestamps are stored as fixed width columns, which are accessed without
+copying. Each object is stored as a JSON string, and parsed only when the
+object is accessed.
+
+::
+
+    write_snapshot("account.snapshot", Collection.get_roots(api), raindrops)
+
+    with Snapshot("account.snapshot") as snapshot:
+        raindrop = snapshot.raindrops.get(2000)
+        for i in snapshot.raindrops.where(ref=100):
+            print(snapshot.raindrops[i].title)
+"""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import (
+    IO,
+    Any,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
+
+from .models import Collection, DictModel, Raindrop, dateparse
+
+__all__ = ["NO_VALUE", "Snapshot", "SnapshotTable", "write_snapshot"]
+
+MAGIC = b"RDSNAP01"
+
+#: Stored in the columns if the value does not exist.
+NO_VALUE = -(2 ** 63)
+_MAX_VALUE = 2 ** 63 - 1
+
+# magic, byte order, number of collections, number of raindrops
+_HEADER = struct.Struct("<8sQQQ")
+_BYTEORDER = {"little": 1, "big": 2}
+
+# id, parent or collection id, created, lastUpdate
+_NUM_COLUMNS = 4
+
+M = TypeVar("M", bound=DictModel)
+
+
+def _timestamp(value: Optional[str]) -> int:
+    """Milliseconds since the epoch."""
+
+    if not value:
+        return NO_VALUE
+    return _ms(dateparse(value))
+
+
+def _ms(d: datetime.datetime) -> int:
+    """Milliseconds since the epoch. Naive datetimes are in UTC."""
+
+    if d.tzinfo is None:
+        d = d.replace(tzinfo=datetime.timezone.utc)
+    return int(d.timestamp() * 1000)
+
+
+def _ref(value: Optional[Any]) -> int:
+    if isinstance(value, dict) and "$id" in value:
+        return int(value["$id"])
+    return NO_VALUE
+
+
+def _write_table(f: IO[bytes], items: Iterable[DictModel], ref: str) -> int:
+    rows = sorted(
+        ((int(item.values["_id"]), item.values) for item in items),
+        key=lambda row: row[0],
+    )
+
+    columns = [array("q") for _ in range(_NUM_COLUMNS)]
+    offsets = array("Q", [0])
+    strings = []
+    pos = 0
+    for id, values in rows:
+        columns[0].append(id)
+        columns[1].append(_ref(values.get(ref)))
+        columns[2].append(_timestamp(values.get("created")))
+        columns[3].append(_timestamp(values.get("lastUpdate")))
+
+        s = json.dumps(values, separators=(",", ":")).encode()
+        strings.append(s)
+        pos += len(s)
+        offsets.append(pos)
+
+    for column in columns:
+        f.write(column.tobytes())
+    f.write(offsets.tobytes())
+    for s in strings:
+        f.write(s)
+    f.write(b"\0" * (-pos % 8))
+
+    return len(rows)
+
+
+def write_snapshot(
+    path: str, collections: Iterable[Collection], raindrops: Iterable[Raindrop]
+) -> None:
+    """Write collections and raindrops to the snapshot file."""
+
+    with open(path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        ncollections = _write_table(f, collections, "parent")
+        nraindrops = _write_table(f, raindrops, "collection")
+
+        f.seek(0)
+        f.write(
+            _HEADER.pack(MAGIC, _BYTEORDER[sys.byteorder], ncollections, nraindrops)
+        )
+
+
+class SnapshotTable(Sequence[M], Generic[M]):
+    """Objects of a type in :class:`Snapshot`, sorted by id.
+
+    Indexing the table returns a new model object parsed from the snapshot.
+    """
+
+    #: (:class:`memoryview`) Ids of objects.
+    ids: memoryview
+    #: (:class:`memoryview`) Parent ids of collections, or collection ids of
+    #: raindrops.
+    refs: memoryview
+    #: (:class:`memoryview`) ``created`` in milliseconds since the epoch.
+    created: memoryview
+    #: (:class:`memoryview`) ``lastUpdate`` in milliseconds since the epoch.
+    lastUpdate: memoryview
+
+    def __init__(self, model: Type[M], buf: memoryview, count: int) -> None:
+        self.model = model
+
+        size = count * 8
+        self.ids, self.refs, self.created, self.lastUpdate = (
+            buf[i * size : (i + 1) * size].cast("q") for i in range(_NUM_COLUMNS)
+        )
+        start = _NUM_COLUMNS * size
+        self._offsets = buf[start : start + (count + 1) * 8].cast("Q")
+
+        start += (count + 1) * 8
+        end = start + self._offsets[count]
+        self._strings = buf[start:end]
+        self.nbytes = end + (-self._offsets[count] % 8)
+
+    def _release(self) -> None:
+        for view in (
+            self.ids,
+            self.refs,
+            self.created,
+            self.lastUpdate,
+            self._offsets,
+            self._strings,
+        ):
+            view.release()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @overload
+    def __getitem__(self, i: int) -> M:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[M]:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[M, List[M]]:
+        if isinstance(i, slice):
+            return [self[n] for n in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("SnapshotTable index out of range")
+        s = self._strings[self._offsets[i] : self._offsets[i + 1]]
+        return self.model(json.loads(bytes(s)))
+
+    def index(self, id: Any, start: int = 0, stop: Optional[int] = None) -> int:
+        """Find the position of the object with the id."""
+
+        n = len(self) if stop is None else stop
+        i = bisect.bisect_left(self.ids, id, start, n)
+        if i == n or self.ids[i] != id:
+            raise ValueError(f"{id} is not in the snapshot")
+        return i
+
+    def get(self, id: int) -> Optional[M]:
+        """Get the object with the id, or ``None`` if not found."""
+
+        try:
+            return self[self.index(id)]
+        except ValueError:
+            return None
+
+    def where(
+        self,
+        ref: Optional[int] = None,
+        created_after: Optional[datetime.datetime] = None,
+        created_before: Optional[datetime.datetime] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        updated_before: Optional[datetime.datetime] = None,
+    ) -> Iterator[int]:
+        """Positions of objects matching all conditions, without parsing them.
+
+        :param ref: Parent id of collections, or collection id of raindrops.
+
+        Date ranges include the bounds. Naive datetimes are in UTC, as the
+        stored dates without a time zone.
+        """
+
+        def ms(d: Optional[datetime.datetime], default: int) -> int:
+            return default if d is None else _ms(d)
+
+        clo = ms(created_after, NO_VALUE)
+        chi = ms(created_before, _MAX_VALUE)
+        ulo = ms(updated_after, NO_VALUE)
+        uhi = ms(updated_before, _MAX_VALUE)
+
+        refs, created, updated = self.refs, self.created, self.lastUpdate
+        for i in range(len(self)):
+            if ref is not None and refs[i] != ref:
+                continue
+            if clo <= created[i] <= chi and ulo <= updated[i] <= uhi:
+                yield i
+
+
+class Snapshot:
+    """Memory mapped snapshot file written by :func:`write_snapshot`.
+
+    :param path: The snapshot file.
+    """
+
+    #: (:class:`SnapshotTable`) Collections in the snapshot.
+    collections: SnapshotTable[Collection]
+    #: (:class:`SnapshotTable`) Raindrops in the snapshot.
+    raindrops: SnapshotTable[Raindrop]
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, byteorder, ncollections, nraindrops = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a snapshot file")
+        if byteorder != _BYTEORDER[sys.byteorder]:
+            self._mmap.close()
+            raise ValueError(f"{path} was written on a different byte order")
+
+        buf = memoryview(self._mmap)[_HEADER.size :]
+        self.collections = SnapshotTable(Collection, buf, ncollections)
+        self.raindrops = SnapshotTable(
+            Raindrop, buf[self.collections.nbytes :], nraindrops
+        )
+        buf.release()
+
+    def __enter__(self) -> Snapshot:
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:  # type: ignore
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file. Objects already parsed remain valid."""
+
+        if not self._mmap.closed:
+            self.collections._release()
+            self.raindrops._release()
+            self._mmap.close()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from typing import Dict, Optional, Union
+
+from .api import API
+from .models import Collection, CollectionRef, Stats
+
+__all__ = ["StatsCache"]
+
+_ALL = CollectionRef.All.id
+_TRASH = CollectionRef.Trash.id
+
+
+class StatsCache:
+    """Caches counts of raindrops for dashboards.
+
+    :param api: The :class:`API` object used to send requests.
+    :param ttl: Seconds to keep the counts. ``None`` to keep them until
+        invalidated.
+
+    While the cache is installed to ``api``, :meth:`Stats.get` returns the
+    cached :class:`Stats`. Raindrops created through this library, and moved
+    by :meth:`Raindrop.update_many` from a known collection, update the
+    cached counts without requests. Other moves and removals discard the
+    cache, since the source collection is unknown::
+
+        cache = StatsCache(api)
+        stats = Stats.get(api)
+        print(stats.all, stats.unsorted, stats.trash)
+        print(cache.count(collection_id))
+    """
+
+    def __init__(self, api: API, ttl: Optional[float] = 60) -> None:
+        self.api = api
+        self.ttl = ttl
+
+        self._lock = threading.RLock()
+        self._stats: Optional[Stats] = None
+        self._stats_time = 0.0
+        self._collections: Optional[Dict[int, int]] = None
+        self._collections_time = 0.0
+
+        api.stats_cache = self
+
+    def __enter__(self) -> StatsCache:
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:  # type: ignore
+        self.close()
+
+    def close(self) -> None:
+        """Uninstall from the :class:`API`."""
+
+        if self.api.stats_cache is self:
+            self.api.stats_cache = None
+
+    def _fresh(self, fetched: float) -> bool:
+        return self.ttl is None or time.monotonic() - fetched < self.ttl
+
+    def get(self) -> Stats:
+        """Return a copy of the cached :class:`Stats`, fetching it if
+        expired."""
+
+        with self._lock:
+            if self._stats is None or not self._fresh(self._stats_time):
+                self._stats = Stats._fetch(self.api)
+                self._stats_time = time.monotonic()
+            return Stats(copy.deepcopy(self._stats.values))
+
+    def collections(self) -> Dict[int, int]:
+        """Return the number of raindrops in each collection, fetching the
+        collections if expired."""
+
+        with self._lock:
+            if self._collections is None or not self._fresh(self._collections_time):
+                fields = ["id", "count"]
+                self._collections = {
+                    c.id: c.count
+                    for getter in (Collection.get_roots, Collection.get_childrens)
+                    for c in getter(self.api, fields=fields)
+                }
+                self._collections_time = time.monotonic()
+            return dict(self._collections)
+
+    def count(self, collection: Union[Collection, CollectionRef, int]) -> int:
+        """Return the number of raindrops in the collection."""
+
+        if isinstance(collection, (Collection, CollectionRef)):
+            collection = collection.id
+        if collection <= 0:
+            return self.get().count(collection)
+        return self.collections().get(collection, 0)
+
+    def moved(self, source: Optional[int], target: Optional[int], n: int = 1) -> None:
+        """Update the cached counts for ``n`` raindrops moved from
+        ``source`` to ``target``. ``source`` is ``None`` for created
+        raindrops, and ``target`` is ``None`` for deleted raindrops."""
+
+        with self._lock:
+            if self._stats is not None:
+                counts = {item["_id"]: item for item in self._stats.items}
+
+                def add(id: int, delta: int) -> None:
+                    if id in counts:
+                        counts[id]["count"] += delta
+
+                for id, delta in ((source, -n), (target, n)):
+                    if id is not None:
+                        add(id, delta)
+                        if id != _TRASH:
+                            add(_ALL, delta)
+
+            if self._collections is not None:
+                for id, delta in ((source, -n), (target, n)):
+                    if id is not None and id in self._collections:
+                        self._collections[id] += delta
+
+    def invalidate(self) -> None:
+        """Discard the cached counts."""
+
+        with self._lock:
+            self._stats = None
+            self._collections = None
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import abc
+import io
+from json import dumps
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# requests and requests_oauthlib take long to import, so they are imported
+# on the first request.
+if TYPE_CHECKING:
+    import httpx
+    import requests
+    from requests_oauthlib import OAuth2Session
+
+    from .api import API
+
+    Response = Union[requests.models.Response, httpx.Response]
+
+__all__ = ["HTTPXTransport", "MemoryTransport", "OAuth2Transport", "Transport"]
+
+
+def _access_token(api: API) -> str:
+    if isinstance(api.token, str):
+        return api.token
+    return str(api.token["access_token"])
+
+
+class Transport(abc.ABC):
+    """Sends HTTP requests on behalf of :class:`~raindropio.api.API`."""
+
+    def open(self, api: API) -> None:
+        """Called by :meth:`API.open` before any request is sent."""
+
+    def close(self) -> None:
+        """Called by :meth:`API.close`. Release connections."""
+
+    @abc.abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[Any, Any]] = None,
+        data: Any = None,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Response:
+        """Send a request and return the response.
+
+        ``data`` is a string, or a file like object to stream. If ``stream``
+        is True, the response body is read by :meth:`iter_content`.
+        ``timeout`` is the seconds to wait for the server to respond or send
+        data, or ``None`` to wait forever.
+        """
+
+    def iter_content(self, resp: Response, chunk_size: int) -> Iterator[bytes]:
+        """Iterate over the response body."""
+        return resp.iter_content(chunk_size)  # type: ignore
+
+
+class OAuth2Transport(Transport):
+    """Default transport built on :class:`requests_oauthlib.OAuth2Session`.
+
+    Refreshes the access token if the token has ``refresh_token`` and it
+    was expired. The session is created on the first request.
+    """
+
+    _api: Optional[API] = None
+    _session: Optional[OAuth2Session] = None
+
+    def open(self, api: API) -> None:
+        self._api = api
+
+    def close(self) -> None:
+        if self._session:
+            self._session.close()
+            self._session = None
+        self._api = None
+
+    @property
+    def session(self) -> Optional[OAuth2Session]:
+        """The session of the opened :class:`API`."""
+        if self._session is None and self._api is not None:
+            self._session = self._create_session(self._api)
+        return self._session
+
+    def _create_session(self, api: API) -> OAuth2Session:
+        from requests_oauthlib import OAuth2Session
+
+        extra: Optional[Dict[str, Any]]
+        if api.client_id and api.client_secret:
+            extra = {
+                "client_id": api.client_id,
+                "client_secret": api.client_secret,
+            }
+        else:
+            extra = None
+
+        def update_token(newtoken: str) -> None:
+            api.token = newtoken
+
+        if isinstance(api.token, str):
+            token = {"access_token": api.token}
+        else:
+            token = api.token
+
+        return OAuth2Session(
+            api.client_id,
+            token=token,
+            auto_refresh_kwargs=extra,
+            auto_refresh_url=api.URL_REFRESH,
+            token_updater=update_token,
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[Any, Any]] = None,
+        data: Any = None,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Response:
+        session = self.session
+        assert session
+        ret: requests.models.Response = session.request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            data=data,
+            stream=stream,
+            timeout=timeout,
+        )
+        return ret
+
+
+class HTTPXTransport(Transport):
+    """Transport built on `httpx <https://www.python-httpx.org/>`_.
+
+    Requests sent from multiple threads share a single HTTP/2 connection.
+    Requires ``httpx[http2]``. Access tokens are not refreshed.
+
+    :param http2: Enable HTTP/2.
+    :param kwargs: Additional arguments to :class:`httpx.Client`.
+    """
+
+    client: Optional[httpx.Client] = None
+    _api: Optional[API] = None
+
+    def __init__(self, http2: bool = True, **kwargs: Any) -> None:
+        self.http2 = http2
+        self.kwargs = kwargs
+
+    def open(self, api: API) -> None:
+        import httpx
+
+        headers = {"Authorization": f"{api.token_type} {_access_token(api)}"}
+        self.client = httpx.Client(http2=self.http2, headers=headers, **self.kwargs)
+        self._api = api
+
+    def close(self) -> None:
+        if self.client:
+            self.client.close()
+            self.client = None
+        self._api = None
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[Any, Any]] = None,
+        data: Any = None,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Response:
+        assert self.client
+        extensions = {}
+        if self._api is not None and self._api._profile is not None:
+            extensions["trace"] = self._api._profile.trace
+        request = self.client.build_request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            content=data,
+            timeout=timeout,
+            extensions=extensions,
+        )
+        return self.client.send(request, stream=stream)
+
+    def iter_content(self, resp: Response, chunk_size: int) -> Iterator[bytes]:
+        return resp.iter_bytes(chunk_size)  # type: ignore
+
+
+class MemoryTransport(Transport):
+    """Transport that returns registered responses without network access.
+
+    ::
+
+        transport = MemoryTransport()
+        transport.add("GET", "https://api.raindrop.io/rest/v1/user", {"user": {}})
+        api = API("token", transport=transport)
+
+    Unregistered URLs return ``404 Not Found``.
+    """
+
+    def __init__(self) -> None:
+        #: Requests sent, as tuples of ``(method, url, params, data)``.
+        self.requests: List[Tuple[str, str, Optional[Dict[Any, Any]], Any]] = []
+        #: Headers of the requests sent.
+        self.headers: List[Dict[str, str]] = []
+        self._responses: Dict[Tuple[str, str], List[requests.models.Response]] = {}
+
+    def add(
+        self,
+        method: str,
+        url: str,
+        json: Any = None,
+        status: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        content: Optional[bytes] = None,
+    ) -> None:
+        """Register a response to ``method`` and ``url``.
+
+        If multiple responses are registered for the same request, they are
+        returned in order and the last one is repeated.
+        """
+        headers = dict(headers or {})
+        if content is None:
+            content = dumps(json).encode()
+            headers.setdefault("Content-Type", "application/json")
+        resp = _response(url, status, headers, content)
+
+        self._responses.setdefault((method, url), []).append(resp)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[Any, Any]] = None,
+        data: Any = None,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Response:
+        from urllib.parse import urlsplit
+
+        if hasattr(data, "read"):
+            data = data.read()
+        self.requests.append((method, url, params, data))
+        self.headers.append(headers)
+
+        path = urlsplit(url)._replace(query="", fragment="").geturl()
+        responses = self._responses.get((method, path))
+        if not responses:
+            return _response(url, 404, {}, b"")
+
+        if len(responses) > 1:
+            return responses.pop(0)
+        return responses[0]
+
+
+def _response(
+    url: str, status: int, headers: Dict[str, str], content: bytes
+) -> requests.models.Response:
+    from requests.models import Response
+
+    resp = Response()
+    resp.status_code = status
+    resp.url = url
+    resp.headers.update(headers)
+    resp._content = content
+    resp._content_consumed = True  # type: ignore[attr-defined]
+    resp.raw = io.BytesIO(content)
+    return resp
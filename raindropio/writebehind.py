@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import threading
+from contextvars import copy_context
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+from .api import API
+from .models import Collection, CollectionRef, Raindrop
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+__all__ = ["UpdateQueue"]
+
+
+class _Pending:
+    def __init__(self) -> None:
+        from concurrent.futures import Future
+
+        self.args: Dict[str, Any] = {}
+        self.future: Future[Optional[Raindrop]] = Future()
+
+
+class UpdateQueue:
+    """Queues :meth:`Raindrop.update` calls and sends them in batches.
+
+    :param api: The :class:`API` object used to send requests.
+    :param max_items: Flush when this number of raindrops are pending.
+    :param max_delay: Flush when the oldest pending update is this many
+        seconds old.
+    :param max_workers: The number of threads to send requests.
+
+    Updates to the same raindrop are merged, later values win. Raindrops
+    sharing the same ``important``/``collection``/``cover`` changes are sent
+    with a single :meth:`Raindrop.update_many` request, and their futures
+    resolve to ``None``. The server reports only the number of raindrops
+    modified by the request, so a raindrop the request did not modify can
+    not be detected. Other updates are sent with :meth:`Raindrop.update`
+    and their futures resolve to the updated :class:`Raindrop`.
+
+    Requests are sent concurrently by background threads. :meth:`update`
+    does not wait for them, even if ``max_items`` is reached. A batch is
+    sent after the previous batches complete, so updates of a raindrop are
+    applied in order.
+
+    ::
+
+        with UpdateQueue(api) as queue:
+            future = queue.update(1000, collection=2000)
+        future.result()
+    """
+
+    #: Fields :meth:`Raindrop.update_many` sets to the given value.
+    BULK_FIELDS = frozenset(["important", "collection", "cover"])
+
+    def __init__(
+        self,
+        api: API,
+        max_items: int = 100,
+        max_delay: float = 1.0,
+        max_workers: int = 4,
+    ):
+        self.api = api
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._pending: Dict[int, _Pending] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self) -> UpdateQueue:
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:  # type: ignore
+        self.close()
+
+    def update(self, id: int, **kwargs: Any) -> Future[Optional[Raindrop]]:
+        """Enqueue an update of the raindrop.
+
+        :param id: The id of the raindrop.
+        :param kwargs: Keyword arguments of :meth:`Raindrop.update`.
+        """
+
+        collection = kwargs.get("collection")
+        if isinstance(collection, (Collection, CollectionRef)):
+            kwargs["collection"] = collection.id
+
+        with self._lock:
+            pending = self._pending.get(id)
+            if pending is None:
+                pending = self._pending[id] = _Pending()
+            pending.args.update(kwargs)
+
+            full = len(self._pending) >= self.max_items
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self._flush()
+        return pending.future
+
+    def flush(self) -> None:
+        """Send all pending updates and wait for them."""
+
+        self._flush().result()
+
+    def close(self) -> None:
+        """Send all pending updates, wait for all requests in progress and
+        stop the threads."""
+
+        self.flush()
+        with self._lock:
+            dispatcher, self._dispatcher = self._dispatcher, None
+            executor, self._executor = self._executor, None
+        for e in (dispatcher, executor):
+            if e is not None:
+                e.shutdown(wait=True)
+
+    def _flush(self) -> Future[None]:
+        """Start sending the pending updates after the batches in
+        progress."""
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if self._dispatcher is None or self._executor is None:
+                self._dispatcher = ThreadPoolExecutor(1)
+                self._executor = ThreadPoolExecutor(self.max_workers)
+
+            # A single dispatcher sends the batches one at a time, so that
+            # updates of a raindrop are sent in the order they were made.
+            return self._dispatcher.submit(
+                copy_context().run, self._send, pending, self._executor
+            )
+
+    def _send(self, pending: Dict[int, _Pending], executor: ThreadPoolExecutor) -> None:
+        """Send the updates in the threads and wait for them."""
+
+        from concurrent.futures import wait
+
+        bulk: Dict[Hashable, List[Tuple[int, _Pending]]] = {}
+        single: List[Tuple[int, _Pending]] = []
+        for id, p in pending.items():
+            if p.args and set(p.args) <= self.BULK_FIELDS:
+                key = tuple(sorted(p.args.items()))
+                bulk.setdefault(key, []).append((id, p))
+            else:
+                single.append((id, p))
+
+        futures = []
+        for entries in bulk.values():
+            if len(entries) == 1:
+                single.extend(entries)
+            else:
+                run = copy_context().run
+                futures.append(executor.submit(run, self._send_many, entries))
+        for id, p in single:
+            run = copy_context().run
+            futures.append(executor.submit(run, self._send_one, id, p))
+        wait(futures)
+
+    def _send_one(self, id: int, pending: _Pending) -> None:
+        try:
+            ret = Raindrop.update(self.api, id, **pending.args)
+        except Exception as e:
+            pending.future.set_exception(e)
+        else:
+            pending.future.set_result(ret)
+
+    def _send_many(self, entries: List[Tuple[int, _Pending]]) -> None:
+        args = entries[0][1].args
+        try:
+            Raindrop.update_many(self.api, [id for id, _ in entries], **args)
+        except Exception as e:
+            for _, pending in entries:
+                pending.future.set_exception(e)
+        else:
+            for _, pending in entries:
+                pending.future.set_result(None)
@@ -1,7 +1,12 @@
+import asyncio
 import json
+import sys
+import threading
 import time
+from typing import Any, List
 from unittest.mock import patch
 
+import pytest
 from requests import Response
 
 from raindropio import *
@@ -30,3 +35,107 @@ def test_refresh() -> None:
 
         assert isinstance(api.token, dict)
         assert api.token["access_token"] == "updated"
+
+
+class SlowTransport(MemoryTransport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def request(self, *args: Any, **kwargs: Any) -> Any:
+        self.release.wait(5)
+        return super().request(*args, **kwargs)
+
+
+def test_coalesce() -> None:
+    transport = SlowTransport()
+    transport.add("GET", "https://localhost", {"user": {}})
+    api = API("dummy", transport=transport)
+
+    results: List[Any] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(api.get("https://localhost")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    transport.release.set()
+    for t in threads:
+        t.join()
+
+    assert len(transport.requests) == 1
+    assert len(results) == 5
+    assert all(r is results[0] for r in results)
+
+    api.get("https://localhost")
+    assert len(transport.requests) == 2
+
+
+def test_coalesce_asyncio() -> None:
+    transport = SlowTransport()
+    transport.add("GET", "https://localhost", {"user": {}})
+    api = API("dummy", transport=transport)
+
+    async def run() -> List[Any]:
+        tasks = [
+            asyncio.ensure_future(api.aget("https://localhost", {"a": 1}))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.1)
+        transport.release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+    assert len(transport.requests) == 1
+    assert results[0].json() == {"user": {}}
+
+
+def test_wait_ratelimit() -> None:
+    api = API("dummy")
+    api.ratelimit_remaining = 0
+    api.ratelimit_reset = int(time.time()) + 1
+    with patch("time.sleep") as m:
+        api.wait_ratelimit()
+        assert m.called
+    assert api.ratelimit_remaining is None
+
+    with patch("time.sleep") as m:
+        api.wait_ratelimit()
+        assert not m.called
+
+
+class ChunkedTransport(MemoryTransport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.sent: List[bytes] = []
+
+    def iter_content(self, resp: Any, chunk_size: int) -> Any:
+        for chunk in super().iter_content(resp, 10):
+            self.sent.append(chunk)
+            yield chunk
+
+
+def test_iter_items() -> None:
+    pytest.importorskip("ijson")
+
+    transport = ChunkedTransport()
+    items = [{"_id": i, "title": "x" * 20, "score": 0.5} for i in range(5)]
+    transport.add("GET", "https://localhost", {"result": True, "items": items})
+    api = API("dummy", transport=transport)
+
+    it = api.iter_items("https://localhost")
+    assert next(it) == items[0]
+    # Items are parsed before the whole body is received.
+    received = sum(len(chunk) for chunk in transport.sent)
+    assert received < len(json.dumps({"result": True, "items": items}))
+    assert list(it) == items[1:]
+
+
+def test_iter_items_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "ijson", None)
+
+    transport = MemoryTransport()
+    transport.add("GET", "https://localhost", {"items": [{"_id": 1}]})
+    api = API("dummy", transport=transport)
+    assert list(api.iter_items("https://localhost")) == [{"_id": 1}]
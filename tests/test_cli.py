@@ -0,0 +1,171 @@
+import json
+from pathlib import Path
+from typing import Any, List, Tuple
+
+import pytest
+
+from raindropio import *
+from raindropio.cli import main
+
+BASE = "https://api.raindrop.io/rest/v1"
+
+raindrops = [
+    {
+        "_id": 1,
+        "link": "https://example.com/a",
+        "tags": ["x"],
+        "created": "2020-01-02T00:00:00Z",
+        "lastUpdate": "2020-01-02T00:00:00Z",
+    },
+    {
+        "_id": 2,
+        "link": "HTTPS://EXAMPLE.COM/a/#top",
+        "tags": ["x", "y"],
+        "created": "2020-01-01T00:00:00Z",
+        "lastUpdate": "2020-01-03T00:00:00Z",
+    },
+]
+
+
+def make_api() -> Tuple[API, MemoryTransport]:
+    transport = MemoryTransport()
+    return API("dummy", transport=transport), transport
+
+
+def write_ndjson(path: Path, items: List[Any]) -> str:
+    path.write_text("".join(json.dumps(item) + "\n" for item in items))
+    return str(path)
+
+
+def read_ndjson(path: Path) -> List[Any]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_export(tmp_path: Path) -> None:
+    api, transport = make_api()
+    transport.add("GET", f"{BASE}/raindrops/0", {"items": raindrops})
+
+    out = tmp_path / "out.ndjson"
+    assert main(["-q", "export", "-o", str(out)], api=api) == 0
+    assert [item["_id"] for item in read_ndjson(out)] == [1, 2]
+
+    assert main(["-q", "export", "--json", "-o", str(out)], api=api) == 0
+    assert [item["_id"] for item in json.loads(out.read_text())] == [1, 2]
+
+
+def test_tag_add_resume(tmp_path: Path) -> None:
+    api, transport = make_api()
+    transport.add("PUT", f"{BASE}/raindrops/0", {"result": True, "modified": 2})
+
+    input = write_ndjson(tmp_path / "in.ndjson", [1, {"_id": 2}])
+    state = str(tmp_path / "state")
+    out = tmp_path / "out.ndjson"
+
+    args = ["-q", "tag", "--add", "z", "--state", state, "-o", str(out), input]
+    assert main(args, api=api) == 0
+    assert len(transport.requests) == 1
+    assert json.loads(transport.requests[0][3]) == {"ids": [1, 2], "tags": ["z"]}
+    assert read_ndjson(out) == [{"id": 1, "ok": True}, {"id": 2, "ok": True}]
+
+    assert main(args, api=api) == 0
+    assert len(transport.requests) == 1
+
+
+def test_tag_remove(tmp_path: Path) -> None:
+    api, transport = make_api()
+    transport.add("PUT", f"{BASE}/raindrop/2", {"item": raindrops[1]})
+
+    input = write_ndjson(tmp_path / "in.ndjson", raindrops)
+    out = tmp_path / "out.ndjson"
+    args = ["-q", "tag", "--remove", "y", "--trust-input", "-o", str(out), input]
+    assert main(args, api=api) == 0
+
+    assert [r[:2] for r in transport.requests] == [("PUT", f"{BASE}/raindrop/2")]
+    assert json.loads(transport.requests[0][3]) == {"tags": ["x"]}
+    results = sorted(read_ndjson(out), key=lambda r: r["id"])
+    assert results[0]["unchanged"]
+
+
+def test_tag_remove_current(tmp_path: Path) -> None:
+    api, transport = make_api()
+    # A tag was added on the server after the export.
+    current = dict(raindrops[1], tags=["x", "y", "z"])
+    transport.add("GET", f"{BASE}/raindrop/2", {"item": current})
+    transport.add("PUT", f"{BASE}/raindrop/2", {"item": current})
+
+    input = write_ndjson(tmp_path / "in.ndjson", [raindrops[1]])
+    out = tmp_path / "out.ndjson"
+    assert main(["-q", "tag", "--remove", "y", "-o", str(out), input], api=api) == 0
+    assert json.loads(transport.requests[1][3]) == {"tags": ["x", "z"]}
+
+
+def test_move_failed(tmp_path: Path) -> None:
+    api, transport = make_api()
+    input = write_ndjson(tmp_path / "in.ndjson", [1, 2])
+    out = tmp_path / "out.ndjson"
+    state = tmp_path / "state"
+
+    args = ["-q", "move", "--to", "10", "--state", str(state), "-o", str(out), input]
+    assert main(args, api=api) == 1
+    assert [r["key"] for r in read_ndjson(out)] == ["1", "2"]
+    assert state.read_text() == ""
+
+    transport.add("PUT", f"{BASE}/raindrops/0", {"result": True, "modified": 2})
+    assert main(args, api=api) == 0
+    assert state.read_text() == "1\n2\n"
+
+
+def test_dedup_offline(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("RAINDROP_TOKEN", raising=False)
+    input = write_ndjson(tmp_path / "in.ndjson", raindrops)
+    out = tmp_path / "out.ndjson"
+
+    assert main(["dedup", "-o", str(out), input]) == 0
+    assert read_ndjson(out) == [
+        {"_id": 1, "link": "https://example.com/a", "duplicate_of": 2}
+    ]
+
+
+def test_import(tmp_path: Path) -> None:
+    api, transport = make_api()
+    transport.add("POST", f"{BASE}/raindrop", {"item": raindrops[0]})
+
+    input = tmp_path / "in.json"
+    input.write_text(json.dumps([{"link": "https://example.com/a", "tags": ["x"]}]))
+    out = tmp_path / "out.ndjson"
+
+    assert main(["-q", "import", "-c", "10", "-o", str(out), str(input)], api=api) == 0
+    assert json.loads(transport.requests[0][3]) == {
+        "link": "https://example.com/a",
+        "tags": ["x"],
+        "collection": {"$id": 10},
+    }
+
+
+def test_import_no_link(tmp_path: Path) -> None:
+    api, transport = make_api()
+    transport.add("POST", f"{BASE}/raindrop", {"item": raindrops[0]})
+
+    input = write_ndjson(tmp_path / "in.ndjson", [{"title": "a"}, raindrops[0]])
+    out = tmp_path / "out.ndjson"
+    assert main(["-q", "import", "-o", str(out), input], api=api) == 1
+
+    results = read_ndjson(out)
+    assert {"key": "#0", "error": "The item has no link"} in results
+    assert len(transport.requests) == 1
+
+
+def test_sync(tmp_path: Path) -> None:
+    api, transport = make_api()
+    updated = dict(raindrops[0], title="new", lastUpdate="2020-01-04T00:00:00Z")
+    transport.add("GET", f"{BASE}/raindrops/0", {"items": [updated]})
+
+    file = tmp_path / "raindrops.ndjson"
+    write_ndjson(file, raindrops)
+    assert main(["-q", "sync", str(file)], api=api) == 0
+
+    params = transport.requests[0][2]
+    assert params
+    search = json.loads(params["search"])
+    assert search == [{"key": "lastUpdate", "val": ">2020-01-02"}]
+    assert read_ndjson(file) == [updated, raindrops[1]]
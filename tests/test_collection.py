@@ -1,6 +1,9 @@
 import datetime
+import json
 from unittest.mock import patch
 
+import pytest
+
 from raindropio import *
 
 collection = {
@@ -91,3 +94,93 @@ def test_delete() -> None:
             "DELETE",
             "https://api.raindrop.io/rest/v1/collection/1000",
         )
+
+
+def test_get_roots_fields() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"items": [collection]}
+        (c,) = Collection.get_roots(api, fields=["id", "title"])
+        assert c.id == 1000
+        assert c.title == "child"
+        assert set(c.values) == {"_id", "title"}
+        with pytest.raises(ValueError):
+            c.parent
+
+
+def test_save() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"item": collection}
+        c = Collection(dict(collection))
+        c.expanded = True
+        c.save(api)
+        assert m.call_args[0] == (
+            "PUT",
+            "https://api.raindrop.io/rest/v1/collection/1000",
+        )
+        assert json.loads(m.call_args[1]["data"]) == {"expanded": True}
+
+
+def test_update_many() -> None:
+    transport = MemoryTransport()
+    transport.add(
+        "PUT", "https://api.raindrop.io/rest/v1/collection/1000", {"item": collection}
+    )
+    api = API("dummy", transport=transport)
+
+    ret = Collection.update_many(api, {1000: {"parent": 1}, 1001: {"sort": 2}})
+    c = ret[1000]
+    assert isinstance(c, Collection) and c.id == 1000
+    assert isinstance(ret[1001], Exception)
+
+    sent = {url: json.loads(data) for _, url, _, data in transport.requests}
+    assert sent == {
+        "https://api.raindrop.io/rest/v1/collection/1000": {"parent": 1},
+        "https://api.raindrop.io/rest/v1/collection/1001": {"sort": 2},
+    }
+
+
+def test_bulk() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"result": True, "count": 3}
+
+        Collection.remove_many(api, [1, 2])
+        assert m.call_args[0] == (
+            "DELETE",
+            "https://api.raindrop.io/rest/v1/collections",
+        )
+        assert json.loads(m.call_args[1]["data"]) == {"ids": [1, 2]}
+
+        Collection.merge(api, [1, 2], to=CollectionRef(3))
+        assert m.call_args[0] == (
+            "PUT",
+            "https://api.raindrop.io/rest/v1/collections/merge",
+        )
+        assert json.loads(m.call_args[1]["data"]) == {"to": 3, "ids": [1, 2]}
+
+        Collection.reorder_all(api, CollectionSort.count_desc)
+        assert json.loads(m.call_args[1]["data"]) == {"sort": "-count"}
+
+        Collection.expand_all(api, False)
+        assert m.call_args[0] == ("PUT", "https://api.raindrop.io/rest/v1/collections")
+        assert json.loads(m.call_args[1]["data"]) == {"expanded": False}
+
+        assert Collection.clean_empty(api) == 3
+        assert m.call_args[0] == (
+            "PUT",
+            "https://api.raindrop.io/rest/v1/collections/clean",
+        )
+
+
+def test_iter_childrens() -> None:
+    transport = MemoryTransport()
+    transport.add(
+        "GET",
+        "https://api.raindrop.io/rest/v1/collections/childrens",
+        {"items": [collection]},
+    )
+    api = API("dummy", transport=transport)
+    (c,) = Collection.iter_childrens(api)
+    assert c.id == 1000
@@ -0,0 +1,41 @@
+import copy
+import pickle
+
+import pytest
+
+from raindropio import *
+
+
+def test_sentinels() -> None:
+    assert CollectionRef.Unsorted.id == -1
+    assert CollectionRef.Trash.id == -99
+    assert CollectionRef.All.id == 0
+    assert CollectionRef.Trash != CollectionRef.Unsorted
+
+
+def test_interned() -> None:
+    ref = CollectionRef({"$db": "", "$id": 100, "$ref": "collections"})
+    assert ref is CollectionRef(100)
+    assert CollectionRef({"$id": -1}) is CollectionRef.Unsorted
+    assert copy.deepcopy(ref) is ref
+    assert pickle.loads(pickle.dumps(ref)) is ref
+
+    counts = {ref: 1}
+    assert counts[CollectionRef(100)] == 1
+
+
+def test_immutable() -> None:
+    with pytest.raises(AttributeError):
+        CollectionRef.Unsorted.id = 10
+
+
+def test_models() -> None:
+    r1 = Raindrop({"collection": {"$id": 100, "$ref": "collections"}})
+    r2 = Raindrop({"collection": {"$id": 100, "$ref": "collections"}})
+    assert r1.collection is r2.collection
+
+    c = Collection({"parent": {"$id": 100}})
+    assert c.parent is r1.collection
+
+    r1.collection = CollectionRef.Trash
+    assert r1.values["collection"] == {"$id": -99}
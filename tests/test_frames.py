@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+
+from raindropio import *
+from raindropio.frames import iter_batches
+
+pa = pytest.importorskip("pyarrow")
+
+raindrops = [
+    {
+        "_id": 1,
+        "collection": {"$id": 10},
+        "title": "a",
+        "domain": "example.com",
+        "type": "link",
+        "tags": ["x", "y"],
+        "important": True,
+        "created": "2020-01-01T00:00:00.000Z",
+        "lastUpdate": "2020-01-02T09:00:00+09:00",
+    },
+    {
+        "_id": 2,
+        "collection": {"$id": -1},
+        "title": "b",
+        "domain": "example.com",
+        "type": "article",
+        "tags": [],
+    },
+]
+
+
+def test_to_arrow() -> None:
+    table = to_arrow([Raindrop(r) for r in raindrops])
+
+    assert table.column("id").to_pylist() == [1, 2]
+    assert table.column("collection").to_pylist() == [10, -1]
+    assert table.column("tags").to_pylist() == [["x", "y"], []]
+    assert table.column("important").to_pylist() == [True, None]
+    assert pa.types.is_dictionary(table.schema.field("domain").type)
+
+    utc = datetime.timezone.utc
+    assert table.column("created").to_pylist() == [
+        datetime.datetime(2020, 1, 1, tzinfo=utc),
+        None,
+    ]
+    assert table.column("lastUpdate")[0].as_py() == datetime.datetime(
+        2020, 1, 2, tzinfo=utc
+    )
+
+
+def test_dicts() -> None:
+    with pytest.raises(TypeError):
+        to_arrow(raindrops)
+
+    collections = [{"_id": 1, "parent": {"$id": 2}, "view": "list", "count": 3}]
+    table = to_arrow(collections, model=Collection)
+    assert table.column("parent").to_pylist() == [2]
+    assert table.column("view").to_pylist() == ["list"]
+
+
+def test_iter_batches() -> None:
+    batches = list(iter_batches(iter([Raindrop(r) for r in raindrops]), chunk_size=1))
+    assert [b.num_rows for b in batches] == [1, 1]
+    assert len(to_arrow([], model=Collection)) == 0
+
+
+def test_fallback_dateparse() -> None:
+    table = to_arrow([{"_id": 1, "created": "Jan 2 2020"}], model=Raindrop)
+    assert table.column("created")[0].as_py().day == 2
+
+
+def test_to_pandas() -> None:
+    pytest.importorskip("pandas")
+
+    df = to_pandas([Raindrop(r) for r in raindrops])
+    assert list(df["id"]) == [1, 2]
+    assert df["domain"].dtype == "category"
+    assert str(df["created"].dtype).startswith("datetime64")
@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+
+# Modules which must not be imported by `import raindropio`.
+HEAVY = [
+    "requests",
+    "requests_oauthlib",
+    "oauthlib",
+    "dateutil",
+    "httpx",
+    "asyncio",
+    "pyarrow",
+    "pandas",
+]
+
+SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+import raindropio
+elapsed = time.perf_counter() - t
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def test_import_time() -> None:
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT], check=True, stdout=subprocess.PIPE
+    ).stdout
+    result = json.loads(out)
+    print(f"import raindropio: {result['elapsed'] * 1000:.1f}ms")
+
+    loaded = {name.split(".")[0] for name in result["modules"]}
+    assert not loaded & set(HEAVY)
+
+
+def test_lazy_dateparse() -> None:
+    from raindropio.models import dateparse
+
+    assert dateparse("2020-01-01T00:00:00Z").year == 2020
@@ -0,0 +1,134 @@
+import threading
+from typing import Any
+
+import pytest
+
+from raindropio import *
+
+URL = "https://api.raindrop.io/rest/v1/"
+
+
+def test_prefetch() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL + "collection/1", {"item": {"_id": 1, "title": "a"}})
+    transport.add("GET", URL + "collection/2", {"item": {"_id": 2, "title": "b"}})
+    transport.add("GET", URL + "raindrop/3", {"item": {"_id": 3, "title": "c"}})
+    transport.add("DELETE", URL + "collection/1", {"result": True})
+    transport.add("PUT", URL + "collections", {"result": True})
+    api = API("dummy", transport=transport)
+
+    with Prefetcher(api) as prefetcher:
+        assert api.prefetcher is prefetcher
+        prefetcher.collections([1, 2])
+        prefetcher.raindrops([3])
+
+        assert Collection.get(api, 1).title == "a"
+        assert Collection.get(api, 2).title == "b"
+        assert Raindrop.get(api, 3).title == "c"
+        assert len(transport.requests) == 3
+
+        c = Collection.get(api, 1)
+        c.title = "modified"
+        assert Collection.get(api, 1).title == "a"
+        assert len(transport.requests) == 3
+
+        prefetcher.collections([1])
+        Collection.get(api, 1)
+        assert len(transport.requests) == 3
+
+        # Raindrops of the removed collection are moved to Trash.
+        Collection.remove(api, 1)
+        Collection.get(api, 1)
+        Raindrop.get(api, 3)
+        assert len(transport.requests) == 6
+
+        prefetcher.raindrops([3])
+        Raindrop.get(api, 3)
+        Collection.expand_all(api)
+        Collection.get(api, 2)
+        Raindrop.get(api, 3)
+        assert len(transport.requests) == 9
+
+    assert api.prefetcher is None
+
+
+def test_prefetch_failed() -> None:
+    api = API("dummy", transport=MemoryTransport())
+    with Prefetcher(api) as prefetcher:
+        prefetcher.collections([1])
+        assert prefetcher.lookup(Collection, 1) is None
+
+
+def test_prefetch_check_conflict() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL + "raindrop/3", {"item": {"_id": 3, "lastUpdate": "a"}})
+    transport.add("GET", URL + "raindrop/3", {"item": {"_id": 3, "lastUpdate": "b"}})
+    api = API("dummy", transport=transport, coalesce=False)
+
+    with Prefetcher(api) as prefetcher:
+        prefetcher.raindrops([3])
+        raindrop = Raindrop.get(api, 3)
+        raindrop.title = "modified"
+        with pytest.raises(ConflictError):
+            raindrop.save(api, check_conflict=True)
+        assert [r[0] for r in transport.requests] == ["GET", "GET"]
+
+
+class BlockingTransport(MemoryTransport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.started = threading.Event()
+        self.resume = threading.Event()
+
+    def request(self, *args: Any, **kwargs: Any) -> Any:
+        self.started.set()
+        self.resume.wait()
+        return super().request(*args, **kwargs)
+
+
+def test_prefetch_invalidate_in_progress() -> None:
+    transport = BlockingTransport()
+    transport.add("GET", URL + "raindrop/3", {"item": {"_id": 3, "title": "old"}})
+    api = API("dummy", transport=transport)
+
+    with Prefetcher(api) as prefetcher:
+        prefetcher.raindrops([3])
+        transport.started.wait()
+        prefetcher.invalidate(Raindrop, 3)
+        transport.resume.set()
+
+        assert prefetcher.lookup(Raindrop, 3) is None
+
+
+def test_prefetch_update_many() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL + "raindrop/1", {"item": {"_id": 1}})
+    transport.add("GET", URL + "raindrop/1", {"item": {"_id": 1, "important": True}})
+    transport.add("PUT", URL + "raindrops/0", {"result": True, "modified": 1})
+    api = API("dummy", transport=transport)
+
+    with Prefetcher(api) as prefetcher:
+        prefetcher.raindrops([1])
+        assert not Raindrop.get(api, 1).important
+
+        Raindrop.update_many(api, [1], important=True)
+        assert Raindrop.get(api, 1).important
+
+
+def test_prefetch_merge() -> None:
+    transport = MemoryTransport()
+    transport.add(
+        "GET", URL + "raindrop/3", {"item": {"_id": 3, "collection": {"$id": 1}}}
+    )
+    transport.add(
+        "GET", URL + "raindrop/3", {"item": {"_id": 3, "collection": {"$id": 2}}}
+    )
+    transport.add("PUT", URL + "collections/merge", {"result": True})
+    api = API("dummy", transport=transport)
+
+    with Prefetcher(api) as prefetcher:
+        prefetcher.raindrops([3])
+        assert Raindrop.get(api, 3).collection.id == 1
+
+        Collection.merge(api, [1], to=2)
+        assert Raindrop.get(api, 3).collection.id == 2
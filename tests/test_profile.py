@@ -0,0 +1,72 @@
+import io
+import json
+
+import pytest
+
+from raindropio import *
+
+URL = "https://api.raindrop.io/rest/v1/raindrop/1000"
+
+
+def make_api() -> API:
+    transport = MemoryTransport()
+    transport.add(
+        "GET",
+        URL,
+        {
+            "item": {
+                "_id": 1000,
+                "title": "title",
+                "created": "2020-01-01T00:00:00Z",
+                "lastUpdate": "2020-01-02T00:00:00Z",
+                "collection": {"$id": -1},
+            }
+        },
+    )
+    return API("dummy", transport=transport)
+
+
+def test_profile() -> None:
+    api = make_api()
+    with api.profile() as profile:
+        raindrop = Raindrop.get(api, 1000)
+        raindrop.created
+        raindrop.created
+
+    assert api._profile is None
+    assert len(profile.requests) == 1
+    timing = profile.requests[0]
+    assert (timing.method, timing.url, timing.status) == ("GET", URL, 200)
+    assert set(timing.timings) == {"connect", "wait", "download", "decode"}
+    assert timing.timings["decode"] > 0
+
+    assert profile.models["Raindrop"].count == 1
+    assert profile.attributes["Raindrop.created"].count == 2
+
+    data = json.loads(json.dumps(profile.as_dict()))
+    assert data["phases"]["wait"]["count"] == 1
+    assert data["models"]["Raindrop"]["count"] == 1
+
+    out = io.StringIO()
+    profile.report(out)
+    assert "Raindrop.created" in out.getvalue()
+
+
+def test_profile_restore() -> None:
+    api = make_api()
+    with api.profile() as profile:
+        pass
+
+    raindrop = Raindrop.get(api, 1000)
+    raindrop.created
+    assert profile.requests == []
+    assert profile.models == {}
+    assert profile.attributes == {}
+
+
+def test_profile_nested() -> None:
+    api = make_api()
+    with api.profile():
+        with pytest.raises(RuntimeError):
+            with api.profile():
+                pass
@@ -1,6 +1,12 @@
 import datetime
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 from unittest.mock import patch
 
+import pytest
+
 from raindropio import *
 
 raindrop = {
@@ -60,6 +66,22 @@ def test_search() -> None:
         assert found[0].id == 2000
 
 
+def test_iter_search() -> None:
+    transport = MemoryTransport()
+    transport.add(
+        "GET", "https://api.raindrop.io/rest/v1/raindrops/0", {"items": [raindrop]}
+    )
+    api = API("dummy", transport=transport)
+
+    (found,) = Raindrop.iter_search(
+        api, collection=CollectionRef.All, word="abc", fields=["id"]
+    )
+    assert found.values == {"_id": 2000}
+    assert json.loads(transport.requests[0][2]["search"]) == [  # type: ignore
+        {"key": "word", "val": "abc"}
+    ]
+
+
 def test_create() -> None:
     api = API("dummy")
     with patch("raindropio.api.OAuth2Session.request") as m:
@@ -85,3 +107,297 @@ def test_remove() -> None:
             "DELETE",
             "https://api.raindrop.io/rest/v1/raindrop/2000",
         )
+
+
+def test_search_fields() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"items": [raindrop]}
+
+        found = Raindrop.search(api, fields=["id", "link", "lastUpdate", "tags"])
+        assert found[0].id == 2000
+        assert found[0].link == "https://www.example.com/"
+        assert found[0].tags == ["abc", "def"]
+        assert set(found[0].values) == {"_id", "link", "lastUpdate", "tags"}
+        with pytest.raises(ValueError):
+            found[0].title
+        # Attributes with a default raise too.
+        with pytest.raises(ValueError):
+            found[0].important
+        assert isinstance(found[0], Raindrop)
+
+        m.return_value.json.return_value = {"item": dict(raindrop, important=True)}
+        found[0].tags = ["abc"]
+        found[0].save(api)
+        assert type(found[0]) is Raindrop
+        assert found[0].important
+
+
+def test_save() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"item": dict(raindrop)}
+        item = Raindrop.get(api, 2000)
+        assert item.dirty == frozenset()
+
+        m.reset_mock()
+        item.save(api)
+        assert not m.called
+
+        item.title = "new title"
+        item.tags = ["xyz"]
+        assert item.dirty == {"title", "tags"}
+
+        m.return_value.json.return_value = {"item": raindrop}
+        item.save(api)
+        assert m.call_args[0] == (
+            "PUT",
+            "https://api.raindrop.io/rest/v1/raindrop/2000",
+        )
+        assert json.loads(m.call_args[1]["data"]) == {
+            "title": "new title",
+            "tags": ["xyz"],
+        }
+        assert item.dirty == frozenset()
+        assert item.title == "title"
+
+
+def test_save_conflict() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {
+            "item": dict(raindrop, lastUpdate="2020-02-01T00:00:00Z")
+        }
+        item = Raindrop(dict(raindrop))
+        item.title = "new title"
+        with pytest.raises(ConflictError):
+            item.save(api, check_conflict=True)
+        assert m.call_count == 1
+        assert m.call_args[0][0] == "GET"
+
+        # lastUpdate assigned locally is compared as loaded.
+        item = Raindrop(dict(raindrop))
+        item.lastUpdate = datetime.datetime(2020, 2, 1, tzinfo=datetime.timezone.utc)
+        with pytest.raises(ConflictError):
+            item.save(api, check_conflict=True)
+        assert m.call_count == 2
+
+
+def test_dirty_lazy() -> None:
+    item = Raindrop(dict(raindrop))
+    assert "_dirty" not in item.__dict__
+    assert item.dirty == frozenset()
+    item.title = "new title"
+    assert item.dirty == frozenset(["title"])
+
+
+def test_search_query() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"items": [raindrop]}
+
+        query = (
+            SearchQuery()
+            .type(RaindropType.article)
+            .domain("example.com")
+            .created(after=datetime.date(2020, 1, 1), before="2020-02-01")
+        )
+        Raindrop.search(
+            api,
+            collection=CollectionRef({"$id": 100}),
+            query=query,
+            tag="abc",
+            sort=SortOrder.created_desc,
+            nested=True,
+        )
+
+        assert m.call_args[0] == (
+            "GET",
+            "https://api.raindrop.io/rest/v1/raindrops/100",
+        )
+        params = m.call_args[1]["params"]
+        assert params["sort"] == "-created"
+        assert params["nested"] == "true"
+        assert json.loads(params["search"]) == [
+            {"key": "type", "val": "article"},
+            {"key": "domain", "val": "example.com"},
+            {"key": "created", "val": ">2020-01-01"},
+            {"key": "created", "val": "<2020-02-01"},
+            {"key": "tag", "val": "abc"},
+        ]
+
+
+def test_search_collections() -> None:
+    def item(id: int, created: str) -> Dict[str, Any]:
+        return dict(raindrop, _id=id, created=created)
+
+    transport = MemoryTransport()
+    url = "https://api.raindrop.io/rest/v1/raindrops/"
+    transport.add(
+        "GET",
+        url + "1",
+        {"items": [item(1, "2020-01-05T00:00:00Z"), item(2, "2020-01-03T00:00:00Z")]},
+    )
+    transport.add("GET", url + "1", {"items": [item(3, "2020-01-01T00:00:00Z")]})
+    transport.add(
+        "GET",
+        url + "2",
+        {"items": [item(4, "2020-01-04T00:00:00Z"), item(2, "2020-01-03T00:00:00Z")]},
+    )
+    transport.add("GET", url + "2", {"items": []})
+    api = API("dummy", transport=transport)
+
+    found = Raindrop.search_collections(
+        api, [1, CollectionRef({"$id": 2})], perpage=2, fields=["id"]
+    )
+    assert [r.id for r in found] == [1, 4, 2, 3]
+    assert len(transport.requests) == 4
+    assert all(
+        params and params["sort"] == "-created"
+        for _, _, params, _ in transport.requests
+    )
+
+    found = Raindrop.search_collections(api, [1], fields=["link"])
+    assert [r.id for r in found] == [3]
+
+    # Pages are requested at the size the server returns.
+    transport.requests.clear()
+    list(Raindrop.search_collections(api, [1], perpage=100))
+    assert transport.requests[0][2] and transport.requests[0][2]["perpage"] == 50
+
+    with pytest.raises(ValueError):
+        next(Raindrop.search_collections(api, [1], sort=SortOrder.score))
+
+
+def test_upload_file(tmp_path: Path) -> None:
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF" + b"x" * 100000)
+
+    transport = MemoryTransport()
+    transport.add(
+        "PUT", "https://api.raindrop.io/rest/v1/raindrop/file", {"item": raindrop}
+    )
+    api = API("dummy", transport=transport)
+
+    progress: List[Tuple[int, Optional[int]]] = []
+    item = Raindrop.upload_file(
+        api,
+        str(path),
+        collection=CollectionRef(100),
+        progress=lambda sent, total: progress.append((sent, total)),
+    )
+    assert item.id == 2000
+
+    body = transport.requests[0][3]
+    assert b'name="file"; filename="doc.pdf"' in body
+    assert b"Content-Type: application/pdf" in body
+    assert b'name="collectionId"\r\n\r\n100\r\n' in body
+    assert b"%PDF" + b"x" * 100000 + b"\r\n" in body
+    assert progress[-1] == (len(body), len(body))
+
+
+def test_upload_cover() -> None:
+    transport = MemoryTransport()
+    transport.add(
+        "PUT",
+        "https://api.raindrop.io/rest/v1/raindrop/2000/cover",
+        {"item": raindrop},
+    )
+    api = API("dummy", transport=transport)
+
+    f = io.BytesIO(b"\x89PNG")
+    Raindrop.upload_cover(api, 2000, f, filename="cover.png")
+    body = transport.requests[0][3]
+    assert b'name="cover"; filename="cover.png"' in body
+    assert b"Content-Type: image/png\r\n\r\n\x89PNG\r\n" in body
+
+
+def test_highlights() -> None:
+    item = Raindrop(
+        dict(
+            raindrop,
+            highlights=[
+                {
+                    "_id": "h1",
+                    "text": "highlighted",
+                    "color": "red",
+                    "created": "2020-01-01T00:00:00Z",
+                }
+            ],
+        )
+    )
+    assert item.highlights[0].id == "h1"
+    assert item.highlights[0].text == "highlighted"
+    assert item.highlights[0].color == "red"
+    assert item.highlights[0].note == ""
+    assert item.file is None
+    assert item.important is False
+    assert len(Raindrop(raindrop).highlights) == 0
+
+
+def test_download_cache(tmp_path: Path) -> None:
+    url = "https://api.raindrop.io/rest/v1/raindrop/2000/cache"
+    content = bytes(range(256)) * 100
+
+    transport = MemoryTransport()
+    transport.add(
+        "GET",
+        url,
+        content=content[1000:],
+        status=206,
+        headers={"Content-Range": f"bytes 1000-{len(content) - 1}/{len(content)}"},
+    )
+    api = API("dummy", transport=transport)
+
+    path = tmp_path / "copy.html"
+    Path(str(path) + ".part").write_bytes(content[:1000])
+
+    item = Raindrop(dict(raindrop, cache={"status": "ready", "size": len(content)}))
+    assert item.cache and item.cache.status == CacheStatus.ready
+
+    results = Raindrop.download_caches(api, [(item, str(path))])
+    assert results == {2000: len(content)}
+    assert path.read_bytes() == content
+    assert transport.headers[0]["Range"] == "bytes=1000-"
+
+    # Completed downloads are skipped.
+    assert Raindrop.download_cache(api, 2000, str(path)) == len(content)
+    assert len(transport.requests) == 1
+
+
+def test_download_cache_size(tmp_path: Path) -> None:
+    url = "https://api.raindrop.io/rest/v1/raindrop/2000/cache"
+    transport = MemoryTransport()
+    transport.add("GET", url, content=b"abc")
+    api = API("dummy", transport=transport)
+
+    path = tmp_path / "copy.html"
+    results = Raindrop.download_caches(api, [(2000, str(path))])
+    assert results == {2000: 3}
+
+    with pytest.raises(IOError):
+        Raindrop.download_cache(api, 2000, str(path), expected_size=10)
+
+    path.unlink()
+    with pytest.raises(IOError):
+        Raindrop.download_cache(api, 2000, str(path), expected_size=10)
+    assert not path.exists()
+
+
+def test_download_cache_complete_part(tmp_path: Path) -> None:
+    url = "https://api.raindrop.io/rest/v1/raindrop/2000/cache"
+    transport = MemoryTransport()
+    transport.add("GET", url, status=416, headers={"Content-Range": "bytes */3"})
+    api = API("dummy", transport=transport)
+
+    # The download was interrupted after writing the last chunk.
+    path = tmp_path / "copy.html"
+    Path(str(path) + ".part").write_bytes(b"abc")
+    assert Raindrop.download_cache(api, 2000, str(path)) == 3
+    assert path.read_bytes() == b"abc"
+    assert transport.headers[0]["Range"] == "bytes=3-"
+
+    path.unlink()
+    Path(str(path) + ".part").write_bytes(b"abcd")
+    with pytest.raises(IOError):
+        Raindrop.download_cache(api, 2000, str(path))
@@ -0,0 +1,223 @@
+import threading
+import time
+from typing import Any, List, Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import HTTPError
+
+from raindropio import *
+
+URL = "https://api.raindrop.io/rest/v1/raindrop/1000"
+
+
+class TimeoutTransport(MemoryTransport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.timeouts: List[Optional[float]] = []
+
+    def request(self, *args: Any, **kwargs: Any) -> Any:
+        self.timeouts.append(kwargs.get("timeout"))
+        return super().request(*args, **kwargs)
+
+
+def respond(transport: MemoryTransport, json: Any = None, status: int = 200) -> None:
+    transport._responses.pop(("GET", URL), None)
+    transport.add("GET", URL, json, status=status)
+
+
+def test_deadline() -> None:
+    transport = TimeoutTransport()
+    transport.add("GET", URL, {"item": {}})
+    api = API("dummy", transport=transport, timeout=60)
+
+    api.get(URL)
+    assert transport.timeouts == [60]
+
+    with api.deadline(5):
+        api.get(URL)
+        with api.deadline(10):
+            api.get(URL)
+    timeouts = transport.timeouts[1:]
+    assert all(t is not None and 4 < t <= 5 for t in timeouts)
+
+    with api.deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            api.get(URL)
+    assert len(transport.requests) == 3
+
+
+def test_circuit_breaker() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL, status=503)
+    breaker = CircuitBreaker(threshold=2, reset_timeout=0.05)
+    api = API("dummy", transport=transport, breaker=breaker, coalesce=False)
+
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            api.get(URL)
+    assert breaker.state("GET", URL) == "open"
+
+    # Other ids share the circuit of the endpoint.
+    with pytest.raises(CircuitOpenError):
+        api.get("https://api.raindrop.io/rest/v1/raindrop/2000")
+    assert len(transport.requests) == 2
+
+    time.sleep(0.05)
+    assert breaker.state("GET", URL) == "half-open"
+    respond(transport, {"item": {"_id": 1000}})
+    assert Raindrop.get(api, 1000).id == 1000
+    assert breaker.state("GET", URL) == "closed"
+
+
+def test_client_error() -> None:
+    transport = MemoryTransport()
+    breaker = CircuitBreaker(threshold=1)
+    api = API("dummy", transport=transport, breaker=breaker)
+
+    with pytest.raises(HTTPError):
+        api.get(URL)
+    assert breaker.state("GET", URL) == "closed"
+
+
+def test_stale() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL, {"item": {"_id": 1000}})
+    transport.add("GET", URL, status=500)
+    breaker = CircuitBreaker(threshold=2, reset_timeout=0.05, stale=True)
+    api = API("dummy", transport=transport, breaker=breaker, coalesce=False)
+
+    assert Raindrop.get(api, 1000).id == 1000
+    assert not api.stale
+
+    # Failed requests return the last response.
+    assert Raindrop.get(api, 1000).id == 1000
+    assert api.stale
+    Raindrop.get(api, 1000)
+    assert breaker.state("GET", URL) == "open"
+
+    # The circuit is open; the request is not sent.
+    Raindrop.get(api, 1000)
+    assert api.stale
+    assert len(transport.requests) == 3
+
+    # After reset_timeout, the request is sent in background.
+    respond(transport, {"item": {"_id": 1000, "title": "new"}})
+    time.sleep(0.05)
+    Raindrop.get(api, 1000)
+    assert api.stale
+    for _ in range(100):
+        if breaker.state("GET", URL) == "closed":
+            break
+        time.sleep(0.01)
+    assert breaker.state("GET", URL) == "closed"
+
+    assert Raindrop.get(api, 1000).title == "new"
+    assert not api.stale
+
+
+def test_stale_per_token() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL, {"item": {"_id": 1000}})
+    transport.add("GET", URL, status=503)
+    breaker = CircuitBreaker(stale=True)
+    alice = API("alice", transport=transport, breaker=breaker)
+    bob = API("bob", transport=transport, breaker=breaker)
+
+    assert Raindrop.get(alice, 1000).id == 1000
+    with pytest.raises(HTTPError):
+        Raindrop.get(bob, 1000)
+    assert Raindrop.get(alice, 1000).id == 1000
+    assert alice.stale
+
+
+def test_stale_max_responses() -> None:
+    transport = MemoryTransport()
+    breaker = CircuitBreaker(stale=True, max_responses=2)
+    api = API("dummy", transport=transport, breaker=breaker)
+    for id in (1, 2, 3):
+        url = f"https://api.raindrop.io/rest/v1/raindrop/{id}"
+        transport.add("GET", url, {"item": {"_id": id}})
+        Raindrop.get(api, id)
+
+    assert [key[1][-1] for key in breaker._responses] == ["2", "3"]
+
+
+def test_deadline_coalesced() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL, {"item": {}})
+    api = API("dummy", transport=transport)
+
+    # Another thread's request to the same url is in progress.
+    leader = threading.Event()
+    with patch.object(API, "_request", side_effect=lambda *args, **kw: leader.wait()):
+        thread = threading.Thread(target=api.get, args=(URL,))
+        thread.start()
+        time.sleep(0.01)
+
+        with api.deadline(0.05), pytest.raises(DeadlineExceeded):
+            api.get(URL)
+        leader.set()
+        thread.join()
+
+
+def test_deadline_scheduler() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL, {"item": {}})
+    scheduler = Scheduler(max_concurrency=1, lanes={"interactive": Lane(0)})
+    api = API("dummy", transport=transport, scheduler=scheduler)
+
+    # The only slot is taken until after the deadline.
+    name = scheduler.acquire()
+    start = time.monotonic()
+    with api.deadline(0.02), pytest.raises(DeadlineExceeded):
+        api.get(URL)
+    assert time.monotonic() - start < 0.5
+    assert scheduler.lanes["interactive"].queued == 0
+    assert transport.requests == []
+    scheduler.release(name)
+
+
+def test_deadline_probe() -> None:
+    transport = MemoryTransport()
+    transport.add("GET", URL, status=503)
+    scheduler = Scheduler(max_concurrency=1, lanes={"interactive": Lane(0)})
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.01)
+    api = API("dummy", transport=transport, scheduler=scheduler, breaker=breaker)
+
+    with pytest.raises(HTTPError):
+        api.get(URL)
+    time.sleep(0.01)
+
+    # The probe runs out of time before it is sent.
+    name = scheduler.acquire()
+    with api.deadline(0.02), pytest.raises(DeadlineExceeded):
+        api.get(URL)
+    scheduler.release(name)
+    assert breaker.state("GET", URL) == "half-open"
+    assert len(transport.requests) == 1
+
+    respond(transport, {"item": {}})
+    api.get(URL)
+    assert breaker.state("GET", URL) == "closed"
+
+
+def test_stale_coalesced() -> None:
+    api = API("dummy", transport=MemoryTransport())
+    resp = MagicMock(stale=True)
+    leader = threading.Event()
+
+    def request(*args: Any, **kwargs: Any) -> Any:
+        leader.wait()
+        return resp
+
+    with patch.object(API, "_request", side_effect=request):
+        thread = threading.Thread(target=api.get, args=(URL,))
+        thread.start()
+        time.sleep(0.01)
+        threading.Timer(0.01, leader.set).start()
+
+        assert api.get(URL) is resp
+        assert api.stale
+        thread.join()
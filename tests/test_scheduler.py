@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from typing import List
+
+import pytest
+
+from raindropio import *
+
+
+def acquire_in_thread(
+    scheduler: Scheduler, name: str, order: List[str]
+) -> threading.Thread:
+    def run() -> None:
+        scheduler.acquire(name)
+        order.append(name)
+
+    t = threading.Thread(target=run)
+    t.start()
+    return t
+
+
+def wait_queued(scheduler: Scheduler, name: str, n: int) -> None:
+    for _ in range(100):
+        if scheduler.lanes[name].queued == n:
+            return
+        time.sleep(0.01)
+    raise AssertionError("not queued")
+
+
+def test_priority() -> None:
+    scheduler = Scheduler(max_concurrency=1)
+    scheduler.acquire("batch")
+
+    order: List[str] = []
+    t1 = acquire_in_thread(scheduler, "batch", order)
+    wait_queued(scheduler, "batch", 1)
+    t2 = acquire_in_thread(scheduler, "interactive", order)
+    wait_queued(scheduler, "interactive", 1)
+
+    scheduler.release("batch")
+    t2.join(1)
+    assert order == ["interactive"]
+
+    scheduler.release("interactive")
+    t1.join(1)
+    assert order == ["interactive", "batch"]
+
+    stats = scheduler.stats()
+    assert stats["batch"]["requests"] == 2
+    assert stats["interactive"]["requests"] == 1
+    assert stats["batch"]["wait_max"] > 0
+
+
+def test_reserve() -> None:
+    scheduler = Scheduler(max_concurrency=4)
+    for _ in range(3):
+        scheduler.acquire("batch")
+
+    order: List[str] = []
+    t = acquire_in_thread(scheduler, "batch", order)
+    wait_queued(scheduler, "batch", 1)
+    assert order == []
+
+    # The reserved slot is available to interactive requests.
+    scheduler.acquire("interactive")
+    scheduler.release("interactive")
+    scheduler.release("batch")
+    t.join(1)
+    assert order == ["batch"]
+
+
+def test_lane_cap() -> None:
+    scheduler = Scheduler(
+        lanes={"a": Lane(0, max_concurrency=1), "b": Lane(1)}, default="a"
+    )
+    scheduler.acquire()
+
+    order: List[str] = []
+    t1 = acquire_in_thread(scheduler, "a", order)
+    wait_queued(scheduler, "a", 1)
+
+    # A full higher lane does not block lower lanes.
+    scheduler.acquire("b")
+    scheduler.release("a")
+    t1.join(1)
+    assert order == ["a"]
+
+    with pytest.raises(ValueError):
+        scheduler.acquire("unknown")
+
+
+def test_ratelimit_reserve() -> None:
+    transport = MemoryTransport()
+    reset = int(time.time()) + 1
+    transport.add(
+        "GET",
+        "https://localhost",
+        {},
+        headers={
+            "X-RateLimit-Limit": "120",
+            "X-RateLimit-Remaining": "20",
+            "X-RateLimit-Reset": str(reset),
+        },
+    )
+    scheduler = Scheduler()
+    api = API("dummy", transport=transport, scheduler=scheduler, coalesce=False)
+    api.get("https://localhost")
+
+    # 20 requests remain, 30 are reserved for the interactive lane.
+    with lane("batch"):
+        start = time.time()
+        api.get("https://localhost")
+        assert time.time() >= reset - 0.01
+
+    api.get("https://localhost")
+    stats = scheduler.stats()
+    assert stats["interactive"]["requests"] == 2
+    assert stats["batch"]["requests"] == 1
+    assert stats["batch"]["wait_max"] > 0
+    assert time.time() - start < 5
+
+
+def test_lane_in_executors() -> None:
+    transport = MemoryTransport()
+    url = "https://api.raindrop.io/rest/v1/raindrops"
+    transport.add("GET", f"{url}/1", {"items": [{"_id": 1, "created": "2020"}]})
+    transport.add("GET", f"{url}/2", {"items": []})
+    scheduler = Scheduler()
+    api = API("dummy", transport=transport, scheduler=scheduler)
+
+    async def aget() -> None:
+        with lane("batch"):
+            await api.aget(f"{url}/1")
+
+    with lane("batch"):
+        assert [r.id for r in Raindrop.search_collections(api, [1, 2])] == [1]
+    asyncio.run(aget())
+
+    stats = scheduler.stats()
+    assert stats["batch"]["requests"] == 3
+    assert stats["interactive"]["requests"] == 0
@@ -0,0 +1,82 @@
+import datetime
+import time
+from pathlib import Path
+
+import pytest
+
+from raindropio import *
+from raindropio.snapshot import NO_VALUE
+
+
+def raindrop(id: int, collection: int, created: str) -> Raindrop:
+    return Raindrop(
+        {
+            "_id": id,
+            "collection": {"$id": collection, "$ref": "collections"},
+            "created": created,
+            "lastUpdate": created,
+            "title": f"title {id}",
+        }
+    )
+
+
+def test_snapshot(tmp_path: Path) -> None:
+    path = str(tmp_path / "account.snapshot")
+    collections = [Collection({"_id": 100, "title": "title", "parent": None})]
+    raindrops = [
+        raindrop(3, 100, "2020-01-03T00:00:00.000Z"),
+        raindrop(1, 100, "2020-01-01T00:00:00.000Z"),
+        raindrop(2, -1, "2020-01-02T00:00:00Z"),
+    ]
+    write_snapshot(path, collections, raindrops)
+
+    with Snapshot(path) as snapshot:
+        assert len(snapshot.collections) == 1
+        assert snapshot.collections[0].title == "title"
+        assert snapshot.collections.refs[0] == NO_VALUE
+
+        table = snapshot.raindrops
+        assert list(table.ids) == [1, 2, 3]
+        assert list(table.refs) == [100, -1, 100]
+
+        r = table.get(3)
+        assert r and r.title == "title 3"
+        assert r.collection is CollectionRef(100)
+        assert table.get(4) is None
+        assert [x.id for x in table[-2:]] == [2, 3]
+
+        since = datetime.datetime(2020, 1, 2, tzinfo=datetime.timezone.utc)
+        assert list(table.where(ref=100)) == [0, 2]
+        assert list(table.where(ref=100, created_after=since)) == [2]
+        assert list(table.where(updated_before=since)) == [0, 1]
+
+    assert r.title == "title 3"
+    with pytest.raises(ValueError):
+        snapshot.raindrops.ids[0]
+
+
+def test_snapshot_naive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = str(tmp_path / "account.snapshot")
+    raindrops = [
+        raindrop(1, 100, "2020-01-01T00:00:00Z"),
+        raindrop(2, 100, "2020-01-02T00:00:00Z"),
+    ]
+    write_snapshot(path, [], raindrops)
+
+    # Naive datetimes are UTC regardless of the local time zone.
+    monkeypatch.setenv("TZ", "JST-9")
+    time.tzset()
+    try:
+        with Snapshot(path) as snapshot:
+            before = datetime.datetime(2020, 1, 2)
+            assert list(snapshot.raindrops.where(created_before=before)) == [0, 1]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_invalid(tmp_path: Path) -> None:
+    path = tmp_path / "invalid"
+    path.write_bytes(b"\\0" * 64)
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
@@ -0,0 +1,105 @@
+import json
+from typing import Tuple
+from unittest.mock import patch
+
+from raindropio import *
+
+BASE = "https://api.raindrop.io/rest/v1"
+
+stats = {
+    "items": [
+        {"_id": 0, "count": 10},
+        {"_id": -1, "count": 3},
+        {"_id": -99, "count": 2},
+    ],
+    "meta": {"duplicates": {"count": 1}, "broken": {"count": 4}},
+}
+
+
+def make_api() -> Tuple[API, MemoryTransport]:
+    transport = MemoryTransport()
+    transport.add("GET", f"{BASE}/user/stats", stats)
+    transport.add("GET", f"{BASE}/collections", {"items": [{"_id": 10, "count": 5}]})
+    transport.add("GET", f"{BASE}/collections/childrens", {"items": []})
+    return API("dummy", transport=transport), transport
+
+
+def test_get() -> None:
+    api, transport = make_api()
+    ret = Stats.get(api)
+    assert (ret.all, ret.unsorted, ret.trash) == (10, 3, 2)
+    assert (ret.duplicates, ret.broken) == (1, 4)
+    assert ret.count(CollectionRef.Unsorted) == 3
+    assert ret.count(10) == 0
+
+
+def test_cache() -> None:
+    api, transport = make_api()
+    with StatsCache(api, ttl=60) as cache:
+        assert Stats.get(api).all == 10
+        assert Stats.get(api).all == 10
+        assert len(transport.requests) == 1
+
+        assert cache.count(10) == 5
+        assert cache.count(10) == 5
+        assert len(transport.requests) == 3
+
+        with patch("raindropio.stats.time.monotonic", return_value=1e12):
+            Stats.get(api)
+        assert len(transport.requests) == 4
+
+    assert api.stats_cache is None
+
+
+def test_create() -> None:
+    api, transport = make_api()
+    transport.add("POST", f"{BASE}/raindrop", {"item": {"_id": 1}})
+    transport.add(
+        "POST", f"{BASE}/raindrop", {"item": {"_id": 2, "collection": {"$id": 10}}}
+    )
+    cache = StatsCache(api)
+    Stats.get(api)
+    cache.collections()
+
+    Raindrop.create(api, "https://example.com")
+    ret = Stats.get(api)
+    assert (ret.all, ret.unsorted) == (11, 4)
+
+    Raindrop.create(api, "https://example.com", collection=10)
+    assert Stats.get(api).all == 12
+    assert cache.count(10) == 6
+    assert len(transport.requests) == 5
+
+
+def test_update_many() -> None:
+    api, transport = make_api()
+    transport.add("PUT", f"{BASE}/raindrops/-1", {"result": True, "modified": 2})
+    transport.add("PUT", f"{BASE}/raindrops/0", {"result": True, "modified": 2})
+    cache = StatsCache(api)
+    Stats.get(api)
+    cache.collections()
+
+    Raindrop.update_many(
+        api, [1, 2], CollectionRef.Unsorted, collection=CollectionRef.Trash
+    )
+    ret = Stats.get(api)
+    assert (ret.all, ret.unsorted, ret.trash) == (8, 1, 4)
+    assert json.loads(transport.requests[-1][3]) == {
+        "ids": [1, 2],
+        "collection": {"$id": -99},
+    }
+
+    Raindrop.update_many(api, [1, 2], collection=10)
+    Stats.get(api)
+    assert transport.requests[-1][1] == f"{BASE}/user/stats"
+
+
+def test_remove() -> None:
+    api, transport = make_api()
+    transport.add("DELETE", f"{BASE}/raindrop/1", {"result": True})
+    StatsCache(api)
+    Stats.get(api)
+
+    Raindrop.remove(api, 1)
+    Stats.get(api)
+    assert len(transport.requests) == 3
@@ -0,0 +1,59 @@
+import json
+from typing import Any
+
+import pytest
+import requests
+
+from raindropio import *
+
+user = {"_id": 1000, "fullName": "test user"}
+
+
+def test_memory() -> None:
+    transport = MemoryTransport()
+    transport.add(
+        "GET",
+        "https://api.raindrop.io/rest/v1/user",
+        {"user": user},
+        headers={"X-RateLimit-Remaining": "119"},
+    )
+    api = API("dummy", transport=transport)
+    c = User.get(api)
+    assert c.id == 1000
+    assert api.ratelimit_remaining == 119
+
+    assert transport.requests == [
+        ("GET", "https://api.raindrop.io/rest/v1/user", None, None)
+    ]
+
+
+def test_memory_notfound() -> None:
+    api = API("dummy", transport=MemoryTransport())
+    with pytest.raises(requests.HTTPError):
+        User.get(api)
+
+
+def test_memory_sequence() -> None:
+    transport = MemoryTransport()
+    url = "https://api.raindrop.io/rest/v1/collection"
+    transport.add("POST", url, {"item": {"_id": 1}})
+    transport.add("POST", url, {"item": {"_id": 2}})
+    api = API("dummy", transport=transport)
+
+    assert Collection.create(api, title="a").id == 1
+    assert Collection.create(api, title="b").id == 2
+    assert Collection.create(api, title="c").id == 2
+    assert json.loads(transport.requests[0][3]) == {"title": "a"}
+
+
+def test_httpx() -> None:
+    httpx = pytest.importorskip("httpx")
+
+    def handler(request: Any) -> Any:
+        assert request.headers["Authorization"] == "Bearer dummy"
+        return httpx.Response(200, json={"user": user})
+
+    transport = HTTPXTransport(http2=False, transport=httpx.MockTransport(handler))
+    with API("dummy", transport=transport) as api:
+        assert User.get(api).id == 1000
+    assert transport.client is None
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from typing import Any, List
+from unittest.mock import DEFAULT, patch
+
+from raindropio import *
+
+raindrop = {"_id": 2000, "title": "title", "tags": ["abc"]}
+
+
+def test_merge() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"item": raindrop}
+        with UpdateQueue(api) as queue:
+            f1 = queue.update(2000, title="title")
+            f2 = queue.update(2000, tags=["abc"])
+            assert f1 is f2
+            assert not m.called
+
+        assert m.call_count == 1
+        assert m.call_args[0] == (
+            "PUT",
+            "https://api.raindrop.io/rest/v1/raindrop/2000",
+        )
+        assert json.loads(m.call_args[1]["data"]) == {"title": "title", "tags": ["abc"]}
+        item = f1.result()
+        assert item and item.id == 2000
+
+
+def test_bulk() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"result": True, "modified": 2}
+        with UpdateQueue(api) as queue:
+            f1 = queue.update(1, collection=CollectionRef({"$id": 10}))
+            f2 = queue.update(2, collection=10)
+
+        assert m.call_count == 1
+        assert m.call_args[0] == ("PUT", "https://api.raindrop.io/rest/v1/raindrops/0")
+        assert json.loads(m.call_args[1]["data"]) == {
+            "ids": [1, 2],
+            "collection": {"$id": 10},
+        }
+        assert f1.result() is None
+        assert f2.result() is None
+
+
+def test_max_items() -> None:
+    api = API("dummy")
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"item": raindrop}
+        queue = UpdateQueue(api, max_items=2)
+        f1 = queue.update(1, title="a")
+        assert not m.called
+        f2 = queue.update(2, title="b")
+        f1.result()
+        f2.result()
+        assert m.call_count == 2
+        queue.close()
+
+
+def test_max_items_background() -> None:
+    api = API("dummy")
+    sent = threading.Event()
+    resume = threading.Event()
+
+    def request(*args: Any, **kwargs: Any) -> Any:
+        sent.set()
+        resume.wait()
+        return DEFAULT
+
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"item": raindrop}
+        m.side_effect = request
+        with UpdateQueue(api, max_items=2) as queue:
+            f1 = queue.update(1, title="a")
+            f2 = queue.update(2, title="b")
+            # update() returns while the requests are in progress.
+            assert sent.wait(1)
+            assert not f1.done() and not f2.done()
+            resume.set()
+        assert f1.result() and f2.result()
+        assert m.call_count == 2
+
+
+def test_order() -> None:
+    api = API("dummy")
+    titles: List[str] = []
+
+    def request(*args: Any, **kwargs: Any) -> Any:
+        title = json.loads(kwargs["data"])["title"]
+        if title == "first":
+            time.sleep(0.05)
+        titles.append(title)
+        return DEFAULT
+
+    with patch("raindropio.api.OAuth2Session.request") as m:
+        m.return_value.json.return_value = {"item": raindrop}
+        m.side_effect = request
+        with UpdateQueue(api, max_items=1) as queue:
+            queue.update(1, title="first")
+            queue.update(1, title="second")
+
+    assert titles == ["first", "second"]